@@ -0,0 +1,101 @@
+"""Cold-start time of the sentiment analyzer service.
+
+Each sample is a fresh interpreter. Two numbers are reported per path:
+
+* ``serving``: time until the module that defines the Flask app has been
+  imported, i.e. when the process could start accepting connections
+* ``ready``: time until a ``SentimentIntensityAnalyzer`` has scored its
+  first text (what ``/ready`` waits for)
+
+Paths:
+
+* ``before``: NLTK imported up front, lexicon unzipped and parsed by
+  NLTK's own loader (the original ``app.py``)
+* ``zip``: ``app.py`` without a compiled lexicon file
+* ``compiled``: ``app.py`` with the marshal-compiled lexicon
+
+    python -m benchmarks.analyzer_startup --runs 5
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SERVICE_DIR = os.path.join("djangoapp", "microservices")
+
+BEFORE = (
+    "import time\n"
+    "_start = time.perf_counter()\n"
+    "import nltk\n"
+    "from nltk.sentiment import SentimentIntensityAnalyzer\n"
+    "import flask\n"
+    "nltk.data.path.insert(0, {data!r})\n"
+    "sia = SentimentIntensityAnalyzer()\n"
+    "serving = time.perf_counter()\n"
+    "sia.polarity_scores('warm')\n"
+    "ready = time.perf_counter()\n"
+    "print((serving - _start) * 1000, (ready - _start) * 1000)\n"
+)
+
+AFTER = (
+    "import time\n"
+    "_start = time.perf_counter()\n"
+    "import app\n"
+    "serving = time.perf_counter()\n"
+    "app.get_analyzer().polarity_scores('warm')\n"
+    "ready = time.perf_counter()\n"
+    "print((serving - _start) * 1000, (ready - _start) * 1000)\n"
+)
+
+
+def sample(code, compiled_path):
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(SERVICE_DIR))
+    env["LEXICON_COMPILED_PATH"] = compiled_path
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    serving, ready = out.stdout.strip().splitlines()[-1].split()
+    return float(serving), float(ready)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, SERVICE_DIR)
+    import lexicon
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # NLTK looks for <data>/sentiment/vader_lexicon.zip
+        os.makedirs(os.path.join(tmp, "sentiment"))
+        shutil.copy(lexicon.LEXICON_ZIP, os.path.join(tmp, "sentiment"))
+        compiled_path = os.path.join(tmp, "vader_lexicon.marshal")
+        lexicon.compile_lexicon(dest=compiled_path)
+
+        paths = {
+            "before": (BEFORE.format(data=tmp), compiled_path),
+            "zip": (AFTER, compiled_path + ".missing"),
+            "compiled": (AFTER, compiled_path),
+        }
+        print(f"cold start, median of {args.runs} runs")
+        for name, (code, path) in paths.items():
+            runs = [sample(code, path) for _ in range(args.runs)]
+            serving = statistics.median(r[0] for r in runs)
+            ready = statistics.median(r[1] for r in runs)
+            print(
+                f"  {name:9s}: serving {serving:7.1f} ms"
+                f"   ready {ready:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
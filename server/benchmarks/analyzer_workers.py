@@ -0,0 +1,104 @@
+"""Sentiment analyzer throughput (requests/sec) vs. gunicorn worker count.
+
+Starts ``gunicorn -c gunicorn.conf.py app:app`` from the microservice
+directory for each worker count, waits for ``/ready`` and drives
+``/analyze/<text>`` with many concurrent keep-alive requests.
+
+    python -m benchmarks.analyzer_workers --workers 1 2 4 --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+from .common import load_fixture
+
+SERVICE_DIR = os.path.join("djangoapp", "microservices")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url, timeout=30):
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url + "/ready", timeout=1).ok:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("analyzer did not become ready")
+
+
+async def drive(url, texts, total, concurrency):
+    import aiohttp
+
+    limit = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def one(i):
+            text = quote(texts[i % len(texts)], safe="")
+            async with limit:
+                async with session.get(f"{url}/analyze/{text}") as resp:
+                    await resp.read()
+                    return resp.status
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+    assert set(statuses) == {200}, set(statuses)
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    texts = [r["review"] for r in load_fixture("reviews.json")["reviews"]]
+    print(f"cores={os.cpu_count()} requests={args.requests}")
+    for workers in args.workers:
+        port = free_port()
+        env = dict(
+            os.environ,
+            SENTIMENT_WORKERS=str(workers),
+            SENTIMENT_BIND=f"127.0.0.1:{port}",
+        )
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "gunicorn",
+                "-c", "gunicorn.conf.py", "app:app",
+            ],
+            cwd=SERVICE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            url = f"http://127.0.0.1:{port}"
+            wait_ready(url)
+            rps = asyncio.run(
+                drive(url, texts, args.requests, args.concurrency)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"  workers={workers:3d}: {rps:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Throughput of the sync dealer views vs. their async variants.
+
+Both variants run against a stub backend with injected latency, with
+the backend response cache turned off so every request waits on the
+backend (otherwise both sides measure cache hits). The sync
+views are driven by a fixed pool of threads, like gunicorn sync workers.
+The async views are awaited on one event loop with many requests in
+flight, like a single uvicorn process.
+
+    python -m benchmarks.async_views --latency-ms 50 --requests 400
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import (
+    StubAnalyzerHandler,
+    StubBackendHandler,
+    setup_django,
+    start_server,
+)
+
+ROUTES = {
+    "dealers": ("get_dealerships", ()),
+    "details": ("get_dealer_details", (15,)),
+    "reviews": ("get_dealer_reviews", (15,)),
+}
+
+
+def run_sync(view, args, total, workers):
+    from django.test import RequestFactory
+
+    factory = RequestFactory()
+
+    def one(_):
+        return view(factory.get("/"), *args).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        statuses = list(pool.map(one, range(total)))
+    return time.perf_counter() - start, statuses
+
+
+async def run_async(view, args, total, concurrency):
+    from django.test import AsyncRequestFactory
+
+    from djangoapp.async_restapis import close_client
+
+    factory = AsyncRequestFactory()
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limit:
+            response = await view(factory.get("/"), *args)
+            return response.status_code
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    await close_client()
+    return elapsed, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--route", choices=ROUTES, default="details")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--sync-workers", type=int, default=4)
+    parser.add_argument("--async-concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+
+    from djangoapp import restapis, views
+
+    latency = args.latency_ms / 1000
+    backend, backend_url = start_server(StubBackendHandler, latency=latency)
+    analyzer, analyzer_url = start_server(
+        StubAnalyzerHandler, latency=latency
+    )
+    restapis.backend_url = backend_url
+    restapis.sentiment_analyzer_url = analyzer_url + "/"
+    restapis.http_max_concurrency = args.async_concurrency
+    restapis.http_pool_size = args.async_concurrency
+
+    name, view_args = ROUTES[args.route]
+    sync_view = getattr(views, name)
+    async_view = getattr(views, name + "_async")
+
+    no_cache = override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    })
+    with no_cache, contextlib.redirect_stdout(io.StringIO()):
+        sync_s, sync_statuses = run_sync(
+            sync_view, view_args, args.requests, args.sync_workers
+        )
+        async_s, async_statuses = asyncio.run(
+            run_async(
+                async_view,
+                view_args,
+                args.requests,
+                args.async_concurrency,
+            )
+        )
+    backend.shutdown()
+    analyzer.shutdown()
+
+    assert set(sync_statuses) == {200}, set(sync_statuses)
+    assert set(async_statuses) == {200}, set(async_statuses)
+    print(
+        f"route={args.route} requests={args.requests} "
+        f"latency={args.latency_ms}ms"
+    )
+    print(
+        f"  sync  ({args.sync_workers:4d} workers)  : "
+        f"{args.requests / sync_s:8.1f} req/s"
+    )
+    print(
+        f"  async ({args.async_concurrency:4d} in flight): "
+        f"{args.requests / async_s:8.1f} req/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Parity check and throughput of the vectorized bulk sentiment scorer.
+
+Builds a corpus from ``reviews.json`` plus synthetic reviews drawn from
+the VADER lexicon, with negations, boosters, "but", ALL CAPS and
+punctuation mixed in. Every label from ``bulk.BulkScorer`` is compared
+with the per-text path (``polarity_scores`` + ``lexicon.label``, as in
+``app.classify``); any mismatch exits non-zero. Then both paths are
+timed.
+
+    python -m benchmarks.bulk_sentiment --texts 200000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from .common import load_fixture
+
+SERVICE_DIR = "djangoapp/microservices"
+
+FILLER = (
+    "the car dealer service was and it on with for my new salesman price"
+).split()
+# Words that trigger VADER's context rules (and the bulk fallback path)
+CONTEXT = "very not but so this kind of least never don't".split()
+SUFFIXES = ["", "", "", "!", "!!", "?", "??", ",", ".", "..."]
+
+
+def synthetic_corpus(lexicon_words, size, seed=7):
+    rnd = random.Random(seed)
+    texts = []
+    for _ in range(size):
+        words = []
+        for _ in range(rnd.randint(0, 16)):
+            roll = rnd.random()
+            if roll < 0.01:
+                word = rnd.choice(CONTEXT)
+            elif roll < 0.3:
+                word = rnd.choice(lexicon_words)
+            else:
+                word = rnd.choice(FILLER)
+            if rnd.random() < 0.03:
+                word = word.upper()
+            words.append(word + rnd.choice(SUFFIXES))
+        texts.append(" ".join(words))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=200000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, SERVICE_DIR)
+    from bulk import BulkScorer
+    from lexicon import label
+
+    scorer = BulkScorer()
+    analyzer = scorer.analyzer
+    reviews = [r["review"] for r in load_fixture("reviews.json")["reviews"]]
+    corpus = reviews + synthetic_corpus(
+        sorted(scorer.lexicon), args.texts - len(reviews)
+    )
+
+    def per_text():
+        labels = []
+        for text in corpus:
+            scores = analyzer.polarity_scores(text)
+            labels.append(label(scores["pos"], scores["neg"], scores["neu"]))
+        return labels
+
+    start = time.perf_counter()
+    expected = per_text()
+    per_text_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = scorer.label_texts(corpus)
+    bulk_s = time.perf_counter() - start
+
+    mismatches = [
+        (text, g, e) for text, g, e in zip(corpus, got, expected) if g != e
+    ]
+    print(f"texts={len(corpus)}")
+    print(
+        f"  fast path {scorer.fast_path_texts}, "
+        f"fallback {scorer.fallback_texts}"
+    )
+    print(f"  per-text : {len(corpus) / per_text_s:10.0f} texts/s")
+    print(f"  bulk     : {len(corpus) / bulk_s:10.0f} texts/s")
+    print(f"  speedup  : {per_text_s / bulk_s:10.1f}x")
+    if mismatches:
+        print(f"PARITY FAILED: {len(mismatches)} mismatches")
+        for text, g, e in mismatches[:10]:
+            print(f"  {text!r}: bulk={g} per-text={e}")
+        sys.exit(1)
+    print("  parity   : OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Latency of ``catalog.search`` as the CarModel table grows to 1M rows.
+
+Seeds synthetic car models in steps with ``bulk_create`` into a throwaway
+test database and, at each step, times a set of representative filtered
+and keyset-paginated queries. With the composite indexes on CarModel the
+latencies should stay roughly flat as the table grows.
+
+    python -m benchmarks.car_query --steps 10000 100000 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from .common import setup_django
+
+TYPES = ["SEDAN", "SUV", "WAGON", "COUPE", "TRUCK"]
+
+
+def seed(CarMake, CarModel, makes, start, stop, rnd):
+    batch = []
+    for i in range(start, stop):
+        batch.append(
+            CarModel(
+                car_make=rnd.choice(makes),
+                name=f"Model {i}",
+                type=rnd.choice(TYPES),
+                year=rnd.randint(2015, 2023),
+                dealer_id=rnd.randint(1, 500),
+            )
+        )
+        if len(batch) == 10000:
+            CarModel.objects.bulk_create(batch)
+            batch = []
+    CarModel.objects.bulk_create(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--steps", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    setup_django()
+    from djangoapp.catalog import search
+    from djangoapp.models import CarMake, CarModel
+
+    CarModel.objects.all().delete()
+    makes = [
+        CarMake.objects.create(name=f"Make{i}", description="synthetic")
+        for i in range(20)
+    ]
+    rnd = random.Random(42)
+
+    def mid_cursor():
+        middle = CarModel.objects.order_by("-year", "-id").values(
+            "id", "year"
+        )[CarModel.objects.count() // 2]
+        return f"{middle['year']}:{middle['id']}"
+
+    queries = {
+        "make+type+years": lambda: search(
+            make="Make3", car_type="SUV", year_min=2018, year_max=2020
+        ),
+        "dealer+years": lambda: search(
+            dealer_id=250, year_min=2016, year_max=2022
+        ),
+        "type by -year": lambda: search(car_type="COUPE", order="-year"),
+        "deep keyset page": lambda: search(order="-year", after=cursor),
+    }
+
+    seeded = 0
+    print("median latency in ms")
+    print(f"{'rows':>9}  " + "  ".join(f"{q:>16}" for q in queries))
+    for step in args.steps:
+        seed(CarMake, CarModel, makes, seeded, step, rnd)
+        seeded = step
+        cursor = mid_cursor()
+        row = []
+        for run in queries.values():
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                run()
+                samples.append((time.perf_counter() - start) * 1000)
+            row.append(statistics.median(samples))
+        print(f"{seeded:>9}  " + "  ".join(f"{ms:16.2f}" for ms in row))
+
+
+if __name__ == "__main__":
+    main()
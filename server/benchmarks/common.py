@@ -0,0 +1,278 @@
+"""Shared helpers for the scripts in ``benchmarks/``.
+
+Run every benchmark from the ``server`` directory, e.g.
+``python -m benchmarks.sentiment_batch``.
+"""
+
+import itertools
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, unquote, urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+DATA_DIR = os.path.join("database", "data")
+
+POSITIVE_WORDS = {"great", "good", "fantastic", "excellent", "love"}
+NEGATIVE_WORDS = {"bad", "terrible", "awful", "poor", "hate"}
+
+
+def stub_label(text):
+    words = set(text.lower().split())
+    if words & NEGATIVE_WORDS:
+        return "negative"
+    if words & POSITIVE_WORDS:
+        return "positive"
+    return "neutral"
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StubAnalyzerHandler(BaseHTTPRequestHandler):
+    """Speaks the analyzer's HTTP API with a fixed injected latency."""
+
+    latency = 0.0
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if self.path.startswith("/analyze/"):
+            text = unquote(self.path[len("/analyze/"):])
+            self._send_json({"sentiment": stub_label(text)})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        time.sleep(self.latency)
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/analyze_batch":
+            labels = [stub_label(t) for t in payload.get("texts", [])]
+            self._send_json({"sentiments": labels})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+
+def load_fixture(name):
+    with open(os.path.join(DATA_DIR, name), encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+class StubBackendHandler(StubAnalyzerHandler):
+    """Serves the Express routes from the JSON fixtures in database/data."""
+
+    dealers = None
+    reviews = None
+    next_id = None
+    # submission_id of every review taken by /insert_reviews
+    submissions = set()
+
+    @classmethod
+    def _load(cls):
+        if cls.dealers is None:
+            cls.dealers = load_fixture("dealerships.json")["dealerships"]
+            cls.reviews = load_fixture("reviews.json")["reviews"]
+            cls.next_id = itertools.count(
+                max(r["id"] for r in cls.reviews) + 1
+            )
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        self._load()
+        parts = [unquote(p) for p in urlsplit(self.path).path.split("/")]
+        parts = [p for p in parts if p]
+        if parts == ["fetchDealers"]:
+            self._send_json(self.dealers)
+        elif parts[:1] == ["fetchDealers"] and len(parts) == 2:
+            found = [d for d in self.dealers if d["state"] == parts[1]]
+            if not found:
+                self._send_json(
+                    {"message": "No dealers found in this state"}, 404
+                )
+            else:
+                self._send_json(found)
+        elif parts[:1] == ["fetchDealer"] and len(parts) == 2:
+            found = [d for d in self.dealers if str(d["id"]) == parts[1]]
+            if not found:
+                self._send_json({"message": "Dealer not found"}, 404)
+            else:
+                self._send_json(found[0])
+        elif parts == ["fetchReviews"]:
+            self._send_json(self.reviews)
+        elif parts[:2] == ["fetchReviews", "dealer"] and len(parts) == 3:
+            query = parse_qs(urlsplit(self.path).query)
+            after = int(query.get("after", ["-1"])[0])
+            found = sorted(
+                (r for r in self.reviews
+                 if str(r["dealership"]) == parts[2] and r["id"] > after),
+                key=lambda r: r["id"],
+            )
+            if "limit" in query:
+                found = found[:int(query["limit"][0])]
+            self._send_json(found)
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        time.sleep(self.latency)
+        self._load()
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/insert_review":
+            payload["id"] = next(self.next_id)
+            self._send_json(payload)
+        elif self.path == "/insert_reviews":
+            fresh = [
+                r for r in payload["reviews"]
+                if r.get("submission_id") not in self.submissions
+            ]
+            self.submissions.update(r.get("submission_id") for r in fresh)
+            self._send_json({
+                "inserted": len(fresh),
+                "ids": [next(self.next_id) for _ in payload["reviews"]],
+                "duplicates": [
+                    r.get("submission_id") for r in payload["reviews"]
+                    if r not in fresh
+                ],
+            })
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+
+def setup_django(test_db_name=None):
+    """Configure Django against a throwaway test database.
+
+    SQLite test databases are in memory unless ``test_db_name`` names a
+    file; use one when several threads write concurrently, since the
+    shared in-memory database fails on table locks instead of waiting.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "djangoproj.settings")
+    import django
+    from django.db import connections
+    from django.test.utils import setup_databases, setup_test_environment
+
+    django.setup()
+    if test_db_name:
+        connections["default"].settings_dict["TEST"]["NAME"] = test_db_name
+    setup_test_environment()
+    setup_databases(verbosity=0, interactive=False)
+
+
+class _ServerProcess:
+    def __init__(self, process):
+        self.process = process
+
+    def shutdown(self):
+        self.process.terminate()
+        self.process.join()
+
+
+def _serve(handler_class, attrs, port_queue):
+    handler = type(handler_class.__name__, (handler_class,), attrs)
+    server = _StubServer(("127.0.0.1", 0), handler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_server(handler_class, **attrs):
+    """Serve ``handler_class`` on a free localhost port.
+
+    The server runs in a child process so its request handling does not
+    compete with the code under test for the GIL. Keyword arguments are
+    set as class attributes on a subclass, so each server can get its
+    own latency. Returns ``(server, base_url)``; call
+    ``server.shutdown()`` when done.
+    """
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_serve, args=(handler_class, attrs, port_queue), daemon=True
+    )
+    process.start()
+    port = port_queue.get(timeout=10)
+    return _ServerProcess(process), f"http://127.0.0.1:{port}"
+
+
+BENCH_USER = "bench"
+BENCH_PASSWORD = "bench-password"
+
+
+def _serve_django(env, port_queue):
+    os.environ.update(env)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault(
+            "REVIEW_SPOOL_PATH", os.path.join(tmp, "review_spool.sqlite3")
+        )
+        _run_django(os.path.join(tmp, "bench.sqlite3"), port_queue)
+
+
+def _run_django(db_name, port_queue):
+    setup_django(db_name)
+    from django.contrib.auth.models import User
+    from django.core.handlers.wsgi import WSGIHandler
+
+    User.objects.create_user(BENCH_USER, password=BENCH_PASSWORD)
+
+    class Server(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    class Handler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = make_server(
+        "127.0.0.1", 0, WSGIHandler(), server_class=Server,
+        handler_class=Handler,
+    )
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_django(**env):
+    """Serve the Django project over HTTP from a child process.
+
+    ``env`` is added to the child's environment before Django starts, so
+    ``backend_url`` and ``sentiment_analyzer_url`` can point at stub
+    servers. The child uses a fresh test database with one user,
+    ``BENCH_USER``. Returns ``(server, base_url)`` like ``start_server``.
+    """
+    # Spawn, not fork: the parent may already have imported settings and
+    # restapis, which read the environment at import time
+    context = multiprocessing.get_context("spawn")
+    port_queue = context.Queue()
+    process = context.Process(
+        target=_serve_django, args=(env, port_queue), daemon=True
+    )
+    process.start()
+    port = port_queue.get(timeout=60)
+    return _ServerProcess(process), f"http://127.0.0.1:{port}"
+
+
+def timed(func, *args, repeat=5):
+    """Best-of-``repeat`` wall time of ``func(*args)`` in milliseconds."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
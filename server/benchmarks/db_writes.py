@@ -0,0 +1,76 @@
+"""Concurrent registration and login writes against SQLite profiles.
+
+Serves Django from a child process with database-backed sessions and a
+cheap password hasher, so each request is dominated by its writes (a new
+user row, or a session row plus ``last_login``), and drives a mix of
+registrations and logins at several concurrency levels. "legacy" is the
+previous configuration (rollback journal, 5 s timeout, deferred write
+transactions, a new connection per request); "tuned" is the default
+profile from settings.py (WAL, IMMEDIATE transactions, 20 s busy
+timeout, persistent connections).
+
+    python -m benchmarks.db_writes --concurrency 8 32 --requests 400
+"""
+
+import argparse
+import itertools
+
+from .common import start_django
+from .load import SCENARIOS, run_level
+
+PROFILES = {
+    "legacy": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_BUSY_TIMEOUT": "5",
+        "SQLITE_TRANSACTION_MODE": "DEFERRED",
+        "DB_CONN_MAX_AGE": "0",
+    },
+    "tuned": {},
+}
+
+
+def write_mix():
+    scenarios = itertools.cycle([SCENARIOS["register"], SCENARIOS["login"]])
+    return lambda: next(scenarios)()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[8, 32]
+    )
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument(
+        "--profiles", nargs="+", default=list(PROFILES), choices=PROFILES
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'profile':>8} {'conc':>4} {'rps':>8} {'p50':>8} {'p95':>8} "
+        f"{'p99':>8} {'errors':>7}"
+    )
+    for profile in args.profiles:
+        server, base_url = start_django(
+            DJANGO_SESSION_BACKEND="db",
+            PASSWORD_HASH_ITERATIONS="1000",
+            LOG_LEVEL="CRITICAL",
+            **PROFILES[profile],
+        )
+        try:
+            for concurrency in args.concurrency:
+                row = run_level(
+                    base_url, write_mix(), args.requests, concurrency,
+                    concurrency,
+                )
+                print(
+                    f"{profile:>8} {concurrency:>4} "
+                    f"{row['throughput_rps']:8.1f} {row['p50_ms']:8.2f} "
+                    f"{row['p95_ms']:8.2f} {row['p99_ms']:8.2f} "
+                    f"{row['errors']:>7}"
+                )
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
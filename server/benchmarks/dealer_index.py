@@ -0,0 +1,134 @@
+"""State filters and nearest-dealer queries on the dealer index.
+
+Builds a ``DealerIndex`` from synthetic dealers: the real dealers in
+``database/data/dealerships.json``, each copied many times with its
+location scattered around the original city, so the data clusters the
+way dealerships do. Then times multi-state filters against a list scan
+and nearest-N queries (by lat/long, by zip, and within states) against
+a full NumPy distance scan, checking that both return the same dealers.
+
+    python -m benchmarks.dealer_index --dealers 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from .common import load_fixture, setup_django
+from .inventory_query import median_ms
+
+
+def synthetic(count, seed=42):
+    rng = np.random.default_rng(seed)
+    seeds = load_fixture("dealerships.json")["dealerships"]
+    picks = rng.integers(0, len(seeds), count)
+    # About 0.5 degrees (~50 km) of scatter around each seed city
+    lat = rng.normal(0, 0.5, count)
+    lon = rng.normal(0, 0.5, count)
+    dealers = []
+    for i in range(count):
+        seed_dealer = seeds[picks[i]]
+        dealers.append({
+            **seed_dealer,
+            "id": i + 1,
+            "lat": round(seed_dealer["lat"] + lat[i], 4),
+            "long": round(seed_dealer["long"] + lon[i], 4),
+        })
+    return dealers
+
+
+def scan_states(dealers, states):
+    wanted = {s.lower() for s in states}
+    return [
+        d for d in dealers
+        if d["state"].lower() in wanted or d["st"].lower() in wanted
+    ]
+
+
+def scan_nearest(dealers, points, lat, lon, n, states=None):
+    """Nearest ``n`` ids by measuring every dealer's point."""
+    from djangoapp.dealer_index import _unit_vectors
+
+    chord = np.linalg.norm(points - _unit_vectors(lat, lon), axis=1)
+    if states:
+        wanted = {s.lower() for s in states}
+        mask = np.array([
+            d["state"].lower() in wanted or d["st"].lower() in wanted
+            for d in dealers
+        ])
+        chord = np.where(mask, chord, np.inf)
+    top = np.argsort(chord, kind="stable")[:n]
+    return [dealers[row]["id"] for row in top if np.isfinite(chord[row])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dealers", type=int, default=100_000)
+    parser.add_argument("--n", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from djangoapp.dealer_index import DealerIndex, _unit_vectors
+
+    dealers = synthetic(args.dealers)
+    start = time.perf_counter()
+    index = DealerIndex(dealers)
+    print(
+        f"built {index.size} dealers in "
+        f"{time.perf_counter() - start:.2f}s, "
+        f"{len(index.counts)} occupied grid cells"
+    )
+
+    print("median latency in microseconds")
+    print(f"{'query':>22}  {'indexed':>9}  {'scan':>9}  {'speedup':>8}")
+
+    def report(name, indexed_run, scan_run):
+        indexed = median_ms(indexed_run, args.repeat) * 1000
+        scanned = median_ms(scan_run, max(3, args.repeat // 20)) * 1000
+        print(
+            f"{name:>22}  {indexed:9.1f}  {scanned:9.1f}  "
+            f"{scanned / indexed:7.0f}x"
+        )
+
+    for name, states in {
+        "one state": ["Kansas"],
+        "three states": ["Texas", "CA", "new york"],
+    }.items():
+        got = [d["id"] for d in index.in_states(states)]
+        if got != [d["id"] for d in scan_states(dealers, states)]:
+            raise SystemExit(f"{name}: indexed result differs from scan")
+        report(
+            name,
+            lambda: index.in_states(states),
+            lambda: scan_states(dealers, states),
+        )
+
+    points = _unit_vectors(
+        np.array([d["lat"] for d in dealers]),
+        np.array([d["long"] for d in dealers]),
+    )
+    zip_point = index.locate_zip(dealers[0]["zip"])
+    for name, (lat, lon, states) in {
+        "nearest, Kansas City": (39.1, -94.6, None),
+        "nearest, rural Nevada": (39.5, -117.0, None),
+        "nearest, by zip": (*zip_point, None),
+        "nearest in Texas": (39.1, -94.6, ["Texas"]),
+        "nearest in 2 states": (39.1, -94.6, ["KS", "MO"]),
+    }.items():
+        got = [
+            d["id"] for d, _ in index.nearest(lat, lon, args.n, states)
+        ]
+        if got != scan_nearest(dealers, points, lat, lon, args.n, states):
+            raise SystemExit(f"{name}: indexed result differs from scan")
+        report(
+            name,
+            lambda: index.nearest(lat, lon, args.n, states),
+            lambda: scan_nearest(dealers, points, lat, lon, args.n, states),
+        )
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Bytes on the wire and latency with compression and conditional GETs.
+
+Serves Django from a child process (stub backend and analyzer as in
+``benchmarks.load``) and, for the list routes, compares a plain GET, a
+GET accepting gzip, and a repeat visit that sends the ETag back in
+``If-None-Match``. Checks that the compressed body decodes to the plain
+one and that the repeat visit gets a 304.
+
+    python -m benchmarks.http_cache --requests 200
+"""
+
+import argparse
+import gzip
+import statistics
+import time
+
+import requests
+
+from .common import (
+    StubAnalyzerHandler,
+    StubBackendHandler,
+    start_django,
+    start_server,
+)
+
+ROUTES = {
+    "get_dealers": "/djangoapp/get_dealers/",
+    "dealer_reviews": "/djangoapp/reviews/dealer/15/",
+    "getcars": "/djangoapp/get_cars",
+    "inventory": "/djangoapp/inventory/?make=Kia&limit=500",
+}
+
+
+def timed_get(session, url, headers, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = session.get(url, headers=headers, stream=True)
+        wire = response.raw.read()
+        samples.append((time.perf_counter() - start) * 1000)
+    return response, wire, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    backend, backend_url = start_server(StubBackendHandler, latency=0)
+    analyzer, analyzer_url = start_server(StubAnalyzerHandler, latency=0)
+    server, base_url = start_django(
+        backend_url=backend_url,
+        sentiment_analyzer_url=analyzer_url + "/",
+        LOG_LEVEL="WARNING",
+    )
+    session = requests.Session()
+    print(
+        f"{'route':>15} {'mode':>12} {'status':>6} {'bytes':>8} "
+        f"{'p50 ms':>8}"
+    )
+    try:
+        for route, path in ROUTES.items():
+            url = base_url + path
+            plain, plain_wire, plain_ms = timed_get(
+                session, url, {"Accept-Encoding": "identity"}, args.requests
+            )
+            gz, gz_wire, gz_ms = timed_get(
+                session, url, {"Accept-Encoding": "gzip"}, args.requests
+            )
+            revalidate = {
+                "Accept-Encoding": "gzip", "If-None-Match": gz.headers["ETag"]
+            }
+            repeat, repeat_wire, repeat_ms = timed_get(
+                session, url, revalidate, args.requests
+            )
+            body = (
+                gzip.decompress(gz_wire)
+                if gz.headers.get("Content-Encoding") == "gzip"
+                else gz_wire
+            )
+            if body != plain_wire or repeat.status_code != 304:
+                raise SystemExit(f"{route}: compressed body or 304 wrong")
+            for mode, response, wire, ms in (
+                ("identity", plain, plain_wire, plain_ms),
+                ("gzip", gz, gz_wire, gz_ms),
+                ("revalidate", repeat, repeat_wire, repeat_ms),
+            ):
+                print(
+                    f"{route:>15} {mode:>12} {response.status_code:>6} "
+                    f"{len(wire):>8} {ms:8.2f}"
+                )
+    finally:
+        server.shutdown()
+        backend.shutdown()
+        analyzer.shutdown()
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Filtered queries on the in-memory inventory at 10M car records.
+
+Builds an ``Inventory`` from synthetic columns (dealers, makes, models,
+body types, years and mileages drawn at random), then times a set of
+filtered queries through the sorted indexes against a full NumPy scan
+of the same columns, checking that both return the same first page.
+
+    python -m benchmarks.inventory_query --rows 10000000
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from .common import setup_django
+
+MAKES = 40
+MODELS_PER_MAKE = 25
+BODY_TYPES = ["SUV", "Sedan", "Coupe", "Pickup", "Hatchback", "Minivan"]
+
+
+def synthetic(Inventory, rows, dealers, seed=42):
+    rng = np.random.default_rng(seed)
+    make = rng.integers(0, MAKES, rows)
+    model = make * MODELS_PER_MAKE + rng.integers(0, MODELS_PER_MAKE, rows)
+    return Inventory(
+        dealer_id=rng.integers(1, dealers + 1, rows),
+        make=make,
+        model=model,
+        body_type=rng.integers(0, len(BODY_TYPES), rows),
+        year=rng.integers(2015, 2024, rows),
+        mileage=rng.integers(0, 200000, rows),
+        makes=[f"Make{i}" for i in range(MAKES)],
+        models=[f"Model{i}" for i in range(MAKES * MODELS_PER_MAKE)],
+        body_types=BODY_TYPES,
+    )
+
+
+def scan(inventory, limit, dealer_id=None, make=None, model=None,
+         year_min=None, year_max=None, mileage_min=None, mileage_max=None):
+    """The same query as Inventory.query, as a full-column mask."""
+    columns = inventory.columns
+    mask = np.ones(inventory.size, dtype=bool)
+    if dealer_id is not None:
+        mask &= columns["dealer_id"] == dealer_id
+    if make is not None:
+        mask &= columns["make"] == inventory.makes.codes[make]
+    if model is not None:
+        mask &= columns["model"] == inventory.models.codes[model]
+    for name, low, high in (
+        ("year", year_min, year_max),
+        ("mileage", mileage_min, mileage_max),
+    ):
+        if low is not None:
+            mask &= columns[name] >= low
+        if high is not None:
+            mask &= columns[name] <= high
+    return np.flatnonzero(mask)[:limit].tolist()
+
+
+def median_ms(run, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--dealers", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from djangoapp.inventory import Inventory
+
+    start = time.perf_counter()
+    inventory = synthetic(Inventory, args.rows, args.dealers)
+    print(
+        f"built {args.rows} rows in {time.perf_counter() - start:.1f}s, "
+        f"{inventory.nbytes() / 2**20:.0f} MiB columns + indexes"
+    )
+
+    queries = {
+        "dealer": dict(dealer_id=1234),
+        "dealer+years": dict(dealer_id=1234, year_min=2019, year_max=2021),
+        "make+model": dict(make="Make7", model="Model180"),
+        "make+mileage": dict(make="Make7", mileage_max=5000),
+        "model+years+miles": dict(
+            model="Model500", year_min=2022, mileage_max=30000
+        ),
+        "mileage band": dict(mileage_min=100000, mileage_max=100050),
+        "years only": dict(year_min=2020, year_max=2020),
+    }
+
+    print("median latency in ms")
+    print(f"{'query':>18}  {'indexed':>9}  {'scan':>9}  {'speedup':>8}")
+    for name, filters in queries.items():
+        rows, _ = inventory.query(limit=args.limit, **filters)
+        expected = scan(inventory, args.limit, **filters)
+        if [row["id"] for row in rows] != expected:
+            raise SystemExit(f"{name}: indexed result differs from scan")
+        indexed = median_ms(
+            lambda: inventory.query(limit=args.limit, **filters), args.repeat
+        )
+        scanned = median_ms(
+            lambda: scan(inventory, args.limit, **filters),
+            max(3, args.repeat // 4),
+        )
+        print(
+            f"{name:>18}  {indexed:9.3f}  {scanned:9.2f}  "
+            f"{scanned / indexed:7.0f}x"
+        )
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
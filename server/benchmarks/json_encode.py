@@ -0,0 +1,103 @@
+"""Encoding cost of large dealer and review responses.
+
+Times building a response for a large dealer listing (with review
+summaries, as ``get_dealers`` returns it) and a large review page with
+Django's ``JsonResponse`` and with ``FastJsonResponse`` on each encoder
+available here. Then compares relaying a raw backend body: decoding it
+and encoding it again (what ``get_request`` plus a response did) against
+wrapping the bytes as they are with ``envelope``. Every body is decoded
+and checked against the source data.
+
+    python -m benchmarks.json_encode --dealers 100000 --reviews 100000
+"""
+
+import argparse
+import json
+
+from .common import load_fixture, setup_django
+from .dealer_index import synthetic
+from .inventory_query import median_ms
+
+
+def synthetic_reviews(count):
+    seeds = load_fixture("reviews.json")["reviews"]
+    return [
+        {**seeds[i % len(seeds)], "id": i + 1, "sentiment": "positive"}
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dealers", type=int, default=100_000)
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.http import JsonResponse
+
+    from djangoapp import responses
+    from djangoapp.review_stats import summarize
+
+    summary = summarize(None)
+    dealers = [
+        {**d, "review_summary": summary} for d in synthetic(args.dealers)
+    ]
+    payloads = {
+        "dealer listing": {"status": 200, "dealers": dealers},
+        "review page": {
+            "status": 200, "reviews": synthetic_reviews(args.reviews)
+        },
+    }
+
+    builders = {"JsonResponse": lambda data: JsonResponse(data)}
+    for name in ("stdlib", "orjson"):
+        try:
+            dumps = responses.serializer(name)
+        except Exception as exc:  # noqa: BLE001
+            print(f"skipping {name}: {exc}")
+            continue
+        builders[f"Fast ({name})"] = (
+            lambda data, dumps=dumps: responses.HttpResponse(dumps(data))
+        )
+
+    print("median ms per response")
+    print(f"{'payload':>15} {'builder':>15} {'ms':>9} {'MiB':>7}")
+    for payload_name, data in payloads.items():
+        for builder_name, build in builders.items():
+            body = build(data).content
+            if json.loads(body) != data:
+                raise SystemExit(f"{builder_name}: {payload_name} differs")
+            ms = median_ms(lambda: build(data), args.repeat)
+            print(
+                f"{payload_name:>15} {builder_name:>15} {ms:9.1f} "
+                f"{len(body) / 2**20:7.2f}"
+            )
+
+    # Relaying a backend body: the raw bytes, as Express would send them
+    raw = json.dumps(dealers[:1000]).encode()
+    expected = {"status": 200, "dealers": json.loads(raw)}
+
+    def round_trip():
+        return responses.FastJsonResponse(
+            {"status": 200, "dealers": json.loads(raw)}
+        )
+
+    def pass_through():
+        return responses.RawJsonResponse(
+            responses.envelope({"status": 200}, "dealers", raw)
+        )
+
+    print(f"\nrelaying a {len(raw) / 1024:.0f} KiB backend body, median ms")
+    for name, build in (
+        ("decode+encode", round_trip), ("pass-through", pass_through)
+    ):
+        if json.loads(build().content) != expected:
+            raise SystemExit(f"{name}: relayed body differs")
+        print(f"{name:>15} {median_ms(build, args.repeat * 20):9.3f}")
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Latency percentiles and throughput for every route in djangoapp/urls.py.
+
+Starts the Django project over HTTP in a child process, with the Express
+backend and the sentiment analyzer replaced by stub servers that serve
+the fixtures in ``database/data`` after an injected delay. Each route is
+then driven by a pool of client threads at each concurrency level, and
+p50/p95/p99 latency and throughput are written as JSON. Pass a previous
+result file as ``--compare`` to print the change per route and level.
+
+    python -m benchmarks.load --concurrency 1 8 32 --requests 200
+    python -m benchmarks.load --compare benchmarks/results/load-abc123.json
+
+Every named route in ``djangoapp/urls.py`` must have a scenario below;
+the run stops if one is missing.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .common import (
+    BENCH_PASSWORD,
+    BENCH_USER,
+    StubAnalyzerHandler,
+    StubBackendHandler,
+    start_django,
+    start_server,
+)
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+_counter = itertools.count()
+
+
+def _get(path):
+    return lambda: ("GET", path, None)
+
+
+def _register():
+    return (
+        "POST",
+        "/djangoapp/register/",
+        {"username": f"load-{os.getpid()}-{next(_counter)}",
+         "password": "load-password"},
+    )
+
+
+REVIEW = {
+    "name": "Load Test",
+    "dealership": 15,
+    "review": "Great service and a fantastic car",
+    "purchase": True,
+    "purchase_date": "02/16/2021",
+    "car_make": "Audi",
+    "car_model": "A6",
+    "car_year": 2021,
+}
+
+# URL name in djangoapp/urls.py -> () -> (method, path, json body)
+SCENARIOS = {
+    "getcars": _get("/djangoapp/get_cars"),
+    "search_cars": _get("/djangoapp/search_cars/?make=Audi&year_min=2020"),
+    "login": lambda: (
+        "POST",
+        "/djangoapp/login/",
+        {"userName": BENCH_USER, "password": BENCH_PASSWORD},
+    ),
+    "logout": _get("/djangoapp/logout/"),
+    "register": _register,
+    "get_dealers": _get("/djangoapp/get_dealers/"),
+    "get_dealers_by_state": _get("/djangoapp/get_dealers/Kansas/"),
+    "nearest_dealers": _get(
+        "/djangoapp/dealers/nearest/?lat=39.1&long=-94.6&n=5"
+    ),
+    "dealer_details": _get("/djangoapp/dealer/15/"),
+    "dealer_reviews": _get("/djangoapp/reviews/dealer/15/"),
+    "dealer_review_summary": _get("/djangoapp/reviews/dealer/15/summary/"),
+    "add_review": lambda: ("POST", "/djangoapp/add_review", REVIEW),
+    "inventory": _get("/djangoapp/inventory/?make=Kia&year_min=2020"),
+    "dealer_inventory": _get("/djangoapp/inventory/dealer/8/"),
+    "get_dealers_async": _get("/djangoapp/async/get_dealers/"),
+    "get_dealers_by_state_async": _get(
+        "/djangoapp/async/get_dealers/Kansas/"
+    ),
+    "dealer_details_async": _get("/djangoapp/async/dealer/15/"),
+    "dealer_reviews_async": _get("/djangoapp/async/reviews/dealer/15/"),
+}
+
+
+def check_coverage():
+    """Fail if a named route in djangoapp/urls.py has no scenario."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "djangoproj.settings")
+    import django
+
+    django.setup()
+    from djangoapp.urls import urlpatterns
+
+    missing = [p.name for p in urlpatterns if p.name and
+               p.name not in SCENARIOS]
+    if missing:
+        raise SystemExit(f"no load scenario for routes: {missing}")
+
+
+def percentile(sorted_samples, pct):
+    index = min(len(sorted_samples) - 1, int(len(sorted_samples) * pct))
+    return sorted_samples[index]
+
+
+def run_level(base_url, scenario, total, concurrency, warmup):
+    local = threading.local()
+
+    def client():
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+            # Log every client in first so add_review is authorized
+            session.post(
+                base_url + "/djangoapp/login/",
+                json={"userName": BENCH_USER, "password": BENCH_PASSWORD},
+            ).raise_for_status()
+        return session
+
+    def one(_):
+        method, path, body = scenario()
+        session = client()
+        start = time.perf_counter()
+        response = session.request(method, base_url + path, json=body)
+        response.content
+        return time.perf_counter() - start, response.status_code
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(max(warmup, concurrency))))
+        start = time.perf_counter()
+        samples = list(pool.map(one, range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(seconds * 1000 for seconds, _ in samples)
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": sum(1 for _, status in samples if status >= 400),
+        "throughput_rps": round(total / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = {
+            (r["route"], r["concurrency"]): r
+            for r in json.load(fh)["results"]
+        }
+    print(f"\nchange vs {baseline_path} (p95 latency, throughput)")
+    for r in results:
+        old = baseline.get((r["route"], r["concurrency"]))
+        if old is None:
+            continue
+        p95 = (r["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+        rps = (
+            (r["throughput_rps"] - old["throughput_rps"])
+            / old["throughput_rps"] * 100
+        )
+        print(
+            f"{r['route']:>28} c={r['concurrency']:<3} "
+            f"p95 {p95:+6.1f}%  rps {rps:+6.1f}%"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 8, 32]
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument(
+        "--latency-ms", type=float, default=20,
+        help="delay injected by the stub backend and analyzer",
+    )
+    parser.add_argument(
+        "--routes", nargs="+", help="URL names to run (default: all)"
+    )
+    parser.add_argument("--output", help="JSON file for the results")
+    parser.add_argument("--compare", help="earlier JSON result file")
+    args = parser.parse_args()
+
+    check_coverage()
+    routes = args.routes or list(SCENARIOS)
+    latency = args.latency_ms / 1000
+    backend, backend_url = start_server(StubBackendHandler, latency=latency)
+    analyzer, analyzer_url = start_server(
+        StubAnalyzerHandler, latency=latency
+    )
+    server, base_url = start_django(
+        backend_url=backend_url,
+        sentiment_analyzer_url=analyzer_url + "/",
+        LOG_LEVEL="WARNING",
+    )
+
+    results = []
+    try:
+        print(
+            f"{'route':>28} {'conc':>4} {'rps':>8} {'p50':>8} "
+            f"{'p95':>8} {'p99':>8} {'err':>4}"
+        )
+        for route in routes:
+            for concurrency in args.concurrency:
+                row = run_level(
+                    base_url, SCENARIOS[route], args.requests,
+                    concurrency, args.warmup,
+                )
+                row = {"route": route, **row}
+                results.append(row)
+                print(
+                    f"{route:>28} {concurrency:>4} "
+                    f"{row['throughput_rps']:8.1f} {row['p50_ms']:8.2f} "
+                    f"{row['p95_ms']:8.2f} {row['p99_ms']:8.2f} "
+                    f"{row['errors']:>4}"
+                )
+    finally:
+        server.shutdown()
+        backend.shutdown()
+        analyzer.shutdown()
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "latency_ms": args.latency_ms,
+            "requests": args.requests,
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+        fh.write("\n")
+    print(f"\nwrote {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
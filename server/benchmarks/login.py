@@ -0,0 +1,135 @@
+"""Login throughput and authenticated-request cost per session backend.
+
+First times one PBKDF2-SHA256 hash at several work factors in-process.
+Then, for each session backend (``DJANGO_SESSION_BACKEND``) and work
+factor (``PASSWORD_HASH_ITERATIONS``), serves Django from a child process
+and measures login throughput, plus the throughput and database queries
+(from the Server-Timing header) of an authenticated request. Every run
+uses a fresh file cache, since cached_db needs a cache the workers share.
+
+    python -m benchmarks.login --iterations 1000000 600000 --concurrency 8
+
+Choosing the work factor: hashing dominates login, and its cost grows
+linearly with the iteration count, so one core handles about
+1000 / hash_ms logins per second. Pick the largest count whose hash time
+fits the login latency you can accept at peak. Do not go below the
+current OWASP minimum for PBKDF2-HMAC-SHA256 (600,000); add workers for
+login spikes instead. Django's default is 1,000,000. Stored hashes are
+re-encoded at the new count on each user's next login.
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import requests
+
+from .common import BENCH_PASSWORD, BENCH_USER, start_django
+from .load import run_level
+
+BACKENDS = ["db", "cached_db", "signed_cookies"]
+
+
+def login():
+    return (
+        "POST",
+        "/djangoapp/login/",
+        {"userName": BENCH_USER, "password": BENCH_PASSWORD},
+    )
+
+
+def authenticated():
+    # add_review loads request.user, then rejects the empty review body
+    # before any upstream call
+    return ("POST", "/djangoapp/add_review", "")
+
+
+def hash_ms(iterations, repeat=3):
+    from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+    hasher = PBKDF2PasswordHasher()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hasher.encode(BENCH_PASSWORD, hasher.salt(), iterations)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def db_queries(base_url):
+    session = requests.Session()
+    session.post(
+        base_url + "/djangoapp/login/",
+        json={"userName": BENCH_USER, "password": BENCH_PASSWORD},
+    ).raise_for_status()
+    session.post(base_url + "/djangoapp/add_review")  # warm the caches
+    timing = session.post(base_url + "/djangoapp/add_review").headers.get(
+        "Server-Timing", ""
+    )
+    match = re.search(r'db;desc="queries=(\d+)"', timing)
+    return int(match.group(1)) if match else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--iterations", type=int, nargs="+", default=[1000000, 600000]
+    )
+    parser.add_argument("--backends", nargs="+", default=BACKENDS)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+
+    print("PBKDF2-SHA256 hash time")
+    for iterations in sorted(set(args.iterations + [260000, 600000])):
+        ms = hash_ms(iterations)
+        print(
+            f"  {iterations:>9} iterations  {ms:7.1f} ms  "
+            f"~{1000 / ms:5.1f} logins/s per core"
+        )
+
+    print(
+        f"\n{'backend':>15} {'iterations':>10} {'login rps':>10} "
+        f"{'login p95':>10} {'auth rps':>9} {'auth p95':>9} {'queries':>8}"
+    )
+    with tempfile.TemporaryDirectory() as cache_root:
+        run_backends(args, cache_root)
+
+
+def run_backends(args, cache_root):
+    for backend in args.backends:
+        for iterations in args.iterations:
+            server, base_url = start_django(
+                DJANGO_SESSION_BACKEND=backend,
+                # cached_db and the user cache need a shared cache
+                DJANGO_CACHE_BACKEND="file",
+                DJANGO_CACHE_LOCATION=os.path.join(
+                    cache_root, f"{backend}-{iterations}"
+                ),
+                PASSWORD_HASH_ITERATIONS=str(iterations),
+                LOG_LEVEL="CRITICAL",
+            )
+            try:
+                logins = run_level(
+                    base_url, login, args.logins, args.concurrency, 0
+                )
+                auth = run_level(
+                    base_url, authenticated, args.requests,
+                    args.concurrency, args.concurrency,
+                )
+                queries = db_queries(base_url)
+            finally:
+                server.shutdown()
+            print(
+                f"{backend:>15} {iterations:>10} "
+                f"{logins['throughput_rps']:10.1f} "
+                f"{logins['p95_ms']:10.1f} {auth['throughput_rps']:9.1f} "
+                f"{auth['p95_ms']:9.2f} {queries!s:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compare per-review sentiment calls with the batched endpoint.
+
+Starts a stub analyzer with injected per-request latency and labels the
+same set of reviews through ``analyze_review_sentiments`` (one GET each,
+serially and fanned out with ``gather``) and
+``analyze_review_sentiments_batch`` (one POST per chunk).
+
+    python -m benchmarks.sentiment_batch --reviews 200 --latency-ms 5
+"""
+
+import argparse
+import json
+import os
+
+from .common import StubAnalyzerHandler, start_server, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    server, base_url = start_server(
+        StubAnalyzerHandler, latency=args.latency_ms / 1000
+    )
+    os.environ["sentiment_analyzer_url"] = base_url + "/"
+    from djangoapp import restapis
+
+    restapis.sentiment_analyzer_url = base_url + "/"
+
+    path = os.path.join("database", "data", "reviews.json")
+    with open(path, encoding="utf-8") as fh:
+        corpus = [r["review"] for r in json.load(fh)["reviews"]]
+    texts = (corpus * (args.reviews // len(corpus) + 1))[:args.reviews]
+
+    def per_review():
+        return [
+            restapis.analyze_review_sentiments(t)["sentiment"]
+            for t in texts
+        ]
+
+    def fan_out():
+        responses = restapis.gather(
+            [(restapis.analyze_review_sentiments, t) for t in texts]
+        )
+        return [r["sentiment"] for r in responses]
+
+    serial_ms, serial = timed(per_review, repeat=args.repeat)
+    fan_out_ms, fanned = timed(fan_out, repeat=args.repeat)
+    batch_ms, batch = timed(
+        restapis.analyze_review_sentiments_batch, texts, repeat=args.repeat
+    )
+    server.shutdown()
+
+    assert serial == batch, "batch labels differ from per-review labels"
+    assert serial == fanned, "fan-out labels differ from per-review labels"
+    print(f"reviews={args.reviews} latency={args.latency_ms}ms")
+    print(f"  per-review GET : {serial_ms:9.1f} ms")
+    print(f"  fan-out GET    : {fan_out_ms:9.1f} ms")
+    print(f"  batched POST   : {batch_ms:9.1f} ms")
+    print(f"  speedup        : {serial_ms / batch_ms:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
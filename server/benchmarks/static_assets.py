@@ -0,0 +1,105 @@
+"""Page shells and static files: per-request cost and bytes sent.
+
+Runs ``collectstatic`` into a temporary ``STATIC_ROOT`` and reports how
+much the precompressed variants save on the text assets. Then, through
+the full middleware stack, times a page load rendered by
+``TemplateView`` (what the frontend routes did) against the cached
+``spa_shell``, and a CSS file served by ``django.views.static.serve``
+(the DEBUG helper the project used) against ``serve_static`` with gzip,
+checking that each pair sends the same content.
+
+    python -m benchmarks.static_assets --repeat 500
+"""
+
+import argparse
+import gzip
+import os
+import tempfile
+
+from .common import setup_django
+from .inventory_query import median_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test import Client, override_settings
+    from django.urls import path
+    from django.views.generic import TemplateView
+    from django.views.static import serve
+
+    from djangoapp.static_assets import static_files
+    from djangoproj.urls import urlpatterns
+
+    with tempfile.TemporaryDirectory() as root:
+        settings.STATIC_ROOT = root
+        call_command("collectstatic", interactive=False, verbosity=0)
+        plain = packed = 0
+        for entry in static_files().values():
+            if "gzip" in entry.variants:
+                plain += os.path.getsize(entry.path)
+                packed += os.path.getsize(entry.variants["gzip"])
+        print(
+            f"text assets: {plain / 1024:.0f} KiB, "
+            f"{packed / 1024:.0f} KiB precompressed with gzip"
+        )
+
+        # The old routes, mounted next to the current ones
+        old_routes = [
+            path("old/", TemplateView.as_view(template_name="Home.html")),
+            path(
+                "old-static/<path:path>", serve, {"document_root": root}
+            ),
+        ]
+
+        class Urls:
+            pass
+
+        Urls.urlpatterns = old_routes + urlpatterns
+        client = Client()
+        gz = {"HTTP_ACCEPT_ENCODING": "gzip"}
+        with override_settings(ROOT_URLCONF=Urls, ALLOWED_HOSTS=["*"]):
+            old_page = client.get("/old/").content
+            new_page = client.get("/").content
+            if old_page != new_page:
+                raise SystemExit("cached shell differs from the rendering")
+            old_css = b"".join(
+                client.get("/old-static/bootstrap.min.css").streaming_content
+            )
+            new_css = gzip.decompress(b"".join(
+                client.get("/static/bootstrap.min.css", **gz)
+                .streaming_content
+            ))
+            if old_css != new_css:
+                raise SystemExit("served stylesheet differs")
+
+            def fetch(url, **headers):
+                response = client.get(url, **headers)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                return response
+
+            print("median ms per request")
+            for name, run in (
+                ("page, TemplateView", lambda: fetch("/old/")),
+                ("page, spa_shell", lambda: fetch("/")),
+                (
+                    "css, static.serve",
+                    lambda: fetch("/old-static/bootstrap.min.css"),
+                ),
+                (
+                    "css, serve_static gzip",
+                    lambda: fetch("/static/bootstrap.min.css", **gz),
+                ),
+            ):
+                print(f"{name:>24} {median_ms(run, args.repeat):8.3f}")
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
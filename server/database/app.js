@@ -15,10 +15,42 @@ mongoose.connect("mongodb://mongo_db:27017/", { 'dbName': 'dealershipsDB' });
 
 const Reviews = require('./review');
 const Dealerships = require('./dealership');
+const Counters = require('./counter');
+
+// Reserve `count` consecutive ids from a named sequence; returns the last
+async function reserveIds(name, count) {
+  const counter = await Counters.findOneAndUpdate(
+    { _id: name },
+    { $inc: { seq: count } },
+    { new: true, upsert: true }
+  );
+  return counter.seq;
+}
+
+function reviewDocument(id, data) {
+  return {
+    id: id,
+    name: data['name'],
+    dealership: data['dealership'],
+    review: data['review'],
+    purchase: data['purchase'],
+    purchase_date: data['purchase_date'],
+    car_make: data['car_make'],
+    car_model: data['car_model'],
+    car_year: data['car_year'],
+    sentiment: data['sentiment'],
+    submission_id: data['submission_id'],
+  };
+}
 
 try {
-  Reviews.deleteMany({}).then(() => {
-    Reviews.insertMany(reviews_data['reviews']);
+  Reviews.deleteMany({}).then(async () => {
+    await Reviews.insertMany(reviews_data['reviews']);
+    // New reviews are numbered after the seeded ones
+    const last = Math.max(0, ...reviews_data['reviews'].map((r) => r['id']));
+    await Counters.updateOne(
+      { _id: 'reviews' }, { $set: { seq: last } }, { upsert: true }
+    );
   });
   Dealerships.deleteMany({}).then(() => {
     Dealerships.insertMany(dealerships_data['dealerships']);
@@ -46,7 +78,18 @@ app.get('/fetchReviews', async (req, res) => {
 app.get('/fetchReviews/dealer/:id', async (req, res) => {
   try {
     const dealerId = parseInt(req.params.id, 10); // ✅ cast to Number
-    const documents = await Reviews.find({ dealership: dealerId });
+    // Optional keyset pagination: ?after=<review id>&limit=<n>
+    const query = { dealership: dealerId };
+    const after = parseInt(req.query.after, 10);
+    if (!isNaN(after)) {
+      query.id = { $gt: after };
+    }
+    let cursor = Reviews.find(query).sort({ id: 1 });
+    const limit = parseInt(req.query.limit, 10);
+    if (!isNaN(limit)) {
+      cursor = cursor.limit(limit);
+    }
+    const documents = await cursor;
     res.json(documents);
   } catch (error) {
     res.status(500).json({ error: 'Error fetching documents' });
@@ -96,23 +139,11 @@ app.get('/fetchDealer/:id', async (req, res) => {
 
 // ✅ Insert new review
 app.post('/insert_review', express.raw({ type: '*/*' }), async (req, res) => {
-  const data = JSON.parse(req.body);
-  const documents = await Reviews.find().sort({ id: -1 });
-  let new_id = documents[0] ? documents[0]['id'] + 1 : 1;
-
-  const review = new Reviews({
-    id: new_id,
-    name: data['name'],
-    dealership: data['dealership'],
-    review: data['review'],
-    purchase: data['purchase'],
-    purchase_date: data['purchase_date'],
-    car_make: data['car_make'],
-    car_model: data['car_model'],
-    car_year: data['car_year'],
-  });
-
   try {
+    const data = JSON.parse(req.body);
+    const review = new Reviews(
+      reviewDocument(await reserveIds('reviews', 1), data)
+    );
     const savedReview = await review.save();
     res.json(savedReview);
   } catch (error) {
@@ -121,6 +152,39 @@ app.post('/insert_review', express.raw({ type: '*/*' }), async (req, res) => {
   }
 });
 
+// ✅ Insert a batch of reviews: { reviews: [...] }
+app.post('/insert_reviews', express.json({ limit: '5mb' }), async (req, res) => {
+  const items = req.body['reviews'] || [];
+  if (items.length === 0) {
+    return res.json({ inserted: 0, ids: [] });
+  }
+  try {
+    const last = await reserveIds('reviews', items.length);
+    const docs = items.map((data, i) =>
+      reviewDocument(last - items.length + 1 + i, data)
+    );
+    let duplicates = [];
+    try {
+      await Reviews.insertMany(docs, { ordered: false });
+    } catch (error) {
+      // A duplicate submission_id is a retry of a review already stored
+      const writeErrors = error.writeErrors || [];
+      if (writeErrors.length === 0 || writeErrors.some((e) => e.code !== 11000)) {
+        throw error;
+      }
+      duplicates = writeErrors.map((e) => docs[e.index].submission_id);
+    }
+    res.json({
+      inserted: docs.length - duplicates.length,
+      ids: docs.map((d) => d.id),
+      duplicates: duplicates,
+    });
+  } catch (error) {
+    console.log(error);
+    res.status(500).json({ error: 'Error inserting reviews' });
+  }
+});
+
 // ✅ Start the server
 app.listen(port, () => {
   console.log(`Server is running on http://localhost:${port}`);
@@ -0,0 +1,17 @@
+const mongoose = require('mongoose');
+
+const Schema = mongoose.Schema;
+
+// Named sequences, advanced atomically with $inc
+const counters = new Schema({
+  _id: {
+    type: String,
+    required: true
+  },
+  seq: {
+    type: Number,
+    default: 0
+  },
+});
+
+module.exports = mongoose.model('counters', counters);
@@ -40,4 +40,7 @@ const dealerships = new Schema({
   }
 });
 
+// Serves /fetchDealers/:state
+dealerships.index({ state: 1 });
+
 module.exports = mongoose.model('dealerships', dealerships);
@@ -39,6 +39,20 @@ const reviews = new Schema({
     type: Number,
     required: true
   },
+  sentiment: {
+    type: String,
+    required: false
+  },
+  // Set by the Django review queue; retried batches reuse it
+  submission_id: {
+    type: String,
+    required: false
+  },
 });
 
+// Serves the paginated per-dealer query in /fetchReviews/dealer/:id
+reviews.index({ dealership: 1, id: 1 });
+// Lets /insert_reviews drop resubmitted reviews
+reviews.index({ submission_id: 1 }, { unique: true, sparse: true });
+
 module.exports = mongoose.model('reviews', reviews);
@@ -1,5 +1,30 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def seed_catalog(sender, **kwargs):
+    # Seed the car catalog once, after migrations, instead of checking
+    # for an empty table on every get_cars request
+    from .models import CarMake
+    from .populate import initiate
+
+    if not CarMake.objects.exists():
+        initiate()
 
 
 class DjangoappConfig(AppConfig):
     name = "djangoapp"
+
+    def ready(self):
+        # Registers the signal handlers that invalidate the catalog cache
+        # and cached request.user lookups
+        from . import auth_backends, catalog  # noqa: F401
+        from .metrics import install_db_wrapper
+        from .review_queue import start_on_request
+
+        post_migrate.connect(seed_catalog, sender=self)
+        connection_created.connect(install_db_wrapper)
+        # The review flusher starts with the first request a worker serves
+        request_started.connect(start_on_request)
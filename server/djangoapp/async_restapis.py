@@ -0,0 +1,198 @@
+"""Async counterparts of the helpers in ``restapis``, built on aiohttp.
+
+URLs, timeouts and pool limits are read from ``restapis`` so both
+clients share one configuration.
+"""
+
+import asyncio
+import logging
+import weakref
+
+import aiohttp
+
+from . import restapis
+from .metrics import upstream_call
+
+logger = logging.getLogger(__name__)
+
+# aiohttp sessions are bound to the event loop that created them
+_clients = weakref.WeakKeyDictionary()
+
+_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def get_client():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=restapis.http_timeout),
+            connector=aiohttp.TCPConnector(
+                limit=restapis.http_max_concurrency,
+                limit_per_host=restapis.http_pool_size,
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_client():
+    """Close the session bound to the running loop, e.g. on shutdown."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+def _timeout(seconds):
+    return aiohttp.ClientTimeout(total=seconds)
+
+
+async def get_request(endpoint, **kwargs):
+    request_url = restapis.backend_url + endpoint
+    logger.info("backend GET", extra={"url": request_url, "params": kwargs})
+
+    timeout = restapis.admit("backend")
+    if timeout is None:
+        return None
+    client = get_client()
+    try:
+        with restapis.breakers["backend"], upstream_call("backend"):
+            async with client.get(
+                request_url, params=kwargs, timeout=_timeout(timeout)
+            ) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+    except _ERRORS as e:
+        logger.warning(
+            "backend request failed",
+            extra={"url": request_url, "error": str(e)},
+        )
+        return None
+
+
+async def get_raw(endpoint, **kwargs):
+    """``get_request`` returning the body bytes, without decoding them."""
+    request_url = restapis.backend_url + endpoint
+    timeout = restapis.admit("backend")
+    if timeout is None:
+        return None
+    client = get_client()
+    try:
+        with restapis.breakers["backend"], upstream_call("backend"):
+            async with client.get(
+                request_url, params=kwargs, timeout=_timeout(timeout)
+            ) as response:
+                response.raise_for_status()
+                return await response.read()
+    except _ERRORS as e:
+        logger.warning(
+            "backend request failed",
+            extra={"url": request_url, "error": str(e)},
+        )
+        return None
+
+
+async def analyze_review_sentiments(text):
+    request_url = restapis.sentiment_analyzer_url + "analyze/" + text
+    timeout = restapis.admit("sentiment_analyzer")
+    if timeout is None:
+        return None
+    try:
+        with restapis.breakers["sentiment_analyzer"], upstream_call(
+            "sentiment_analyzer"
+        ):
+            async with get_client().get(
+                request_url, timeout=_timeout(timeout)
+            ) as response:
+                response.raise_for_status()
+                # the analyzer answers /analyze/ with a text/html JSON string
+                return await response.json(content_type=None)
+    except _ERRORS as e:
+        logger.warning(
+            "sentiment analyzer request failed", extra={"error": str(e)}
+        )
+        return None
+    except ValueError as err:
+        logger.warning(
+            "unexpected sentiment analyzer response", extra={"error": str(err)}
+        )
+        return None
+
+
+async def _analyze_chunk(request_url, chunk):
+    timeout = restapis.admit("sentiment_analyzer")
+    if timeout is None:
+        return None
+    try:
+        with restapis.breakers["sentiment_analyzer"], upstream_call(
+            "sentiment_analyzer"
+        ):
+            async with get_client().post(
+                request_url, json={"texts": chunk}, timeout=_timeout(timeout)
+            ) as response:
+                response.raise_for_status()
+                payload = await response.json(content_type=None)
+        labels = payload["sentiments"]
+    except _ERRORS as e:
+        logger.warning(
+            "sentiment analyzer request failed", extra={"error": str(e)}
+        )
+        return None
+    except (KeyError, ValueError) as err:
+        logger.warning(
+            "unexpected batch response", extra={"error": str(err)}
+        )
+        return None
+    if len(labels) != len(chunk):
+        logger.warning(
+            "batch response size does not match request size",
+            extra={"sent": len(chunk), "received": len(labels)},
+        )
+        return None
+    return labels
+
+
+async def analyze_review_sentiments_batch(texts):
+    request_url = restapis.sentiment_analyzer_url + "analyze_batch"
+    size = restapis.sentiment_batch_size
+    results = await asyncio.gather(
+        *(
+            _analyze_chunk(request_url, texts[start:start + size])
+            for start in range(0, len(texts), size)
+        )
+    )
+    sentiments = []
+    for labels in results:
+        if labels is None:
+            return None
+        sentiments.extend(labels)
+    return sentiments
+
+
+async def gather(coros, deadline=None):
+    """Await ``coros`` concurrently, mirroring ``restapis.gather``.
+
+    Coroutines still pending after ``deadline`` seconds, or that raised,
+    yield ``None``.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    if not tasks:
+        return []
+    remaining = restapis.remaining_budget()
+    if remaining is not None:
+        remaining = max(remaining, 0)
+        deadline = remaining if deadline is None else min(deadline, remaining)
+    done, not_done = await asyncio.wait(tasks, timeout=deadline)
+    for task in not_done:
+        task.cancel()
+    if not_done:
+        logger.warning(
+            "calls missed the deadline",
+            extra={"missed": len(not_done), "calls": len(tasks)},
+        )
+    return [
+        task.result()
+        if task in done and task.exception() is None
+        else None
+        for task in tasks
+    ]
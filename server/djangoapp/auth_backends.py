@@ -0,0 +1,57 @@
+"""Authentication backend that caches ``request.user`` lookups.
+
+``AuthenticationMiddleware`` resolves the session's user id through the
+backend's ``get_user`` on every authenticated request. This backend keeps
+the user object in Django's cache for ``settings.AUTH_USER_CACHE_TTL``
+seconds and drops it whenever the user row is saved or deleted, so a
+password change (which changes the session auth hash) or deactivation
+takes effect on the next request.
+
+That only holds when every worker shares the cache (file or redis);
+settings leave the TTL at 0 for locmem, and with a TTL of 0 this is
+plain ``ModelBackend``.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+UserModel = get_user_model()
+
+
+def _key(user_id):
+    return f"auth:user:{user_id}"
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        if not settings.AUTH_USER_CACHE_TTL:
+            return super().get_user(user_id)
+        key = _key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TTL)
+        return user
+
+    async def aget_user(self, user_id):
+        if not settings.AUTH_USER_CACHE_TTL:
+            return await super().aget_user(user_id)
+        key = _key(user_id)
+        user = await cache.aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(
+                    key, user, timeout=settings.AUTH_USER_CACHE_TTL
+                )
+        return user
+
+
+@receiver([post_save, post_delete], sender=UserModel)
+def invalidate(sender, instance, **kwargs):
+    cache.delete(_key(instance.pk))
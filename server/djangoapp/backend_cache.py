@@ -0,0 +1,149 @@
+"""TTL cache in front of the read-only Express backend calls.
+
+Responses are stored in Django's cache framework with a per-endpoint
+group TTL (``settings.BACKEND_CACHE_TTLS``). Once an entry passes its TTL
+it is still served for ``settings.BACKEND_CACHE_STALE`` seconds while a
+single background refresh fetches a new copy.
+
+Call ``invalidate()`` when dealer data changes upstream. Keys carry a
+random generation token rather than a counter, so a generation lost to
+culling starts a new keyspace instead of reusing an old one.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import async_restapis, restapis
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "backend:generation"
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def _key(endpoint, raw=False):
+    generation = _generation()
+    kind = "raw:" if raw else ""
+    return f"backend:{generation}:{kind}{endpoint}"
+
+
+def _store(key, group, value):
+    ttl = settings.BACKEND_CACHE_TTLS[group]
+    entry = {"value": value, "fresh_until": time.time() + ttl}
+    cache.set(key, entry, timeout=ttl + settings.BACKEND_CACHE_STALE)
+
+
+def _refresh(key, endpoint, group, raw=False):
+    fetch = restapis.get_raw if raw else restapis.get_request
+    try:
+        value = fetch(endpoint)
+        if value is not None:
+            _store(key, group, value)
+    finally:
+        cache.delete(key + ":refreshing")
+
+
+def _claim_refresh(key):
+    # Only one caller per key starts a refresh while an entry is stale
+    return cache.add(key + ":refreshing", 1, timeout=restapis.http_timeout)
+
+
+def cached_get_request(endpoint, group, raw=False):
+    """``restapis.get_request`` with TTL and stale-while-revalidate.
+
+    ``group`` selects the TTL from ``settings.BACKEND_CACHE_TTLS``. With
+    ``raw`` the undecoded body bytes are cached and returned
+    (``restapis.get_raw``). Failed fetches (``None``) are never cached.
+    """
+    key = _key(endpoint, raw)
+    entry = cache.get(key)
+    if entry is not None:
+        if entry["fresh_until"] < time.time() and _claim_refresh(key):
+            restapis._executor.submit(_refresh, key, endpoint, group, raw)
+        return entry["value"]
+
+    value = (restapis.get_raw if raw else restapis.get_request)(endpoint)
+    if value is not None:
+        _store(key, group, value)
+    return value
+
+
+# The async path uses the cache's a* methods so the redis and file
+# backends do not block the event loop.
+async def _akey(endpoint, raw=False):
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+        generation = await cache.aget(GENERATION_KEY)
+    kind = "raw:" if raw else ""
+    return f"backend:{generation}:{kind}{endpoint}"
+
+
+async def _astore(key, group, value):
+    ttl = settings.BACKEND_CACHE_TTLS[group]
+    entry = {"value": value, "fresh_until": time.time() + ttl}
+    await cache.aset(key, entry, timeout=ttl + settings.BACKEND_CACHE_STALE)
+
+
+async def _arefresh(key, endpoint, group, raw=False):
+    fetch = async_restapis.get_raw if raw else async_restapis.get_request
+    try:
+        value = await fetch(endpoint)
+        if value is not None:
+            await _astore(key, group, value)
+    finally:
+        await cache.adelete(key + ":refreshing")
+
+
+# The event loop holds tasks only weakly; keep running refreshes here
+_refresh_tasks = set()
+
+
+async def acached_get_request(endpoint, group, raw=False):
+    """Async version of ``cached_get_request`` for the ASGI views."""
+    key = await _akey(endpoint, raw)
+    entry = await cache.aget(key)
+    if entry is not None:
+        if entry["fresh_until"] < time.time() and await cache.aadd(
+            key + ":refreshing", 1, timeout=restapis.http_timeout
+        ):
+            task = asyncio.ensure_future(
+                _arefresh(key, endpoint, group, raw)
+            )
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_tasks.discard)
+        return entry["value"]
+
+    fetch = async_restapis.get_raw if raw else async_restapis.get_request
+    value = await fetch(endpoint)
+    if value is not None:
+        await _astore(key, group, value)
+    return value
+
+
+def invalidate(*endpoints):
+    """Drop cached backend responses.
+
+    With endpoints (e.g. ``"/fetchDealer/3"``) only those entries are
+    removed; with no arguments every cached response is discarded.
+    """
+    if endpoints:
+        cache.delete_many(
+            [_key(endpoint, raw) for endpoint in endpoints
+             for raw in (False, True)]
+        )
+        return
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+    logger.info("Backend response cache invalidated.")
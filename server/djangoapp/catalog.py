@@ -0,0 +1,141 @@
+"""Versioned cache of the serialized car catalog served by ``get_cars``.
+
+The catalog only changes through the admin or ``populate.initiate``, so
+its JSON body is built once per catalog version and stored as bytes
+with a strong ETag. Saving or deleting a ``CarMake``/``CarModel``
+replaces the version with a new random token, so a version key lost to
+culling never brings back an old body. Use a shared cache backend (file
+or redis) when several processes serve the site so the new version
+reaches all of them.
+"""
+
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CarMake, CarModel
+
+VERSION_KEY = "catalog:version"
+
+
+def version():
+    token = cache.get(VERSION_KEY)
+    if token is None:
+        # First use or culled: start a fresh version (never a reused one)
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        token = cache.get(VERSION_KEY)
+    return token
+
+
+def build():
+    rows = CarModel.objects.values_list("name", "car_make__name")
+    cars = [{"CarModel": name, "CarMake": make} for name, make in rows]
+    body = json.dumps({"CarModels": cars}).encode("utf-8")
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    return body, etag
+
+
+def get_catalog():
+    """Return ``(body, etag)`` for the current catalog version."""
+    key = f"catalog:body:{version()}"
+    entry = cache.get(key)
+    if entry is None:
+        entry = build()
+        cache.set(key, entry, timeout=None)
+    return entry
+
+
+# ?order= values accepted by search(); each is backed by an index
+SEARCH_ORDERS = {"id", "-id", "year", "-year"}
+SEARCH_FIELDS = ("id", "name", "type", "year", "dealer_id")
+
+
+def search(
+    make=None,
+    car_type=None,
+    year_min=None,
+    year_max=None,
+    dealer_id=None,
+    order="id",
+    limit=50,
+    after=None,
+):
+    """Filter the catalog with keyset pagination.
+
+    ``after`` is the ``next`` cursor of the previous page. Returns
+    ``(rows, next_cursor)`` where rows are plain dicts from ``.values()``
+    and ``next_cursor`` is ``None`` on the last page.
+    """
+    if order not in SEARCH_ORDERS:
+        raise ValueError(f"order must be one of {sorted(SEARCH_ORDERS)}")
+    descending = order.startswith("-")
+    field = order.lstrip("-")
+
+    qs = CarModel.objects.all()
+    if make:
+        qs = qs.filter(
+            car_make__in=CarMake.objects.filter(name__iexact=make)
+        )
+    if car_type:
+        qs = qs.filter(type=car_type)
+    if year_min is not None:
+        qs = qs.filter(year__gte=year_min)
+    if year_max is not None:
+        qs = qs.filter(year__lte=year_max)
+    if dealer_id is not None:
+        qs = qs.filter(dealer_id=dealer_id)
+
+    id_order = "-id" if descending else "id"
+    ordering = [id_order] if field == "id" else [order, id_order]
+
+    def page(queryset, size):
+        return list(
+            queryset.order_by(*ordering).values(
+                *SEARCH_FIELDS, make=F("car_make__name")
+            )[:size]
+        )
+
+    if not after:
+        rows = page(qs, limit + 1)
+    else:
+        value, _, last_id = after.rpartition(":")
+        try:
+            last_id = int(last_id)
+            value = int(value or last_id)
+        except ValueError:
+            raise ValueError("invalid cursor")
+        op = "lt" if descending else "gt"
+        if field == "id":
+            rows = page(qs.filter(**{f"id__{op}": last_id}), limit + 1)
+        else:
+            # Keyset seek on (field, id) as two index range scans: the
+            # rest of the cursor's own field value, then the values past
+            # it. An OR of both conditions makes SQLite scan instead.
+            rows = page(
+                qs.filter(**{field: value, f"id__{op}": last_id}), limit + 1
+            )
+            if len(rows) <= limit:
+                rows += page(
+                    qs.filter(**{f"{field}__{op}": value}),
+                    limit + 1 - len(rows),
+                )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = f"{last[field]}:{last['id']}"
+    return rows, next_cursor
+
+
+@receiver(post_save, sender=CarMake)
+@receiver(post_save, sender=CarModel)
+@receiver(post_delete, sender=CarMake)
+@receiver(post_delete, sender=CarModel)
+def invalidate(**kwargs):
+    cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
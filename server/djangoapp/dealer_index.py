@@ -0,0 +1,268 @@
+"""In-memory dealer index for state filters and nearest-dealer search.
+
+Built from the dealership feed (``/fetchDealers``, the shape of
+``database/data/dealerships.json``) and rebuilt in the background every
+``settings.DEALER_INDEX_REFRESH`` seconds, while queries keep using the
+previous copy.
+
+Each dealer's lat/long becomes a point on the unit sphere, where the
+straight-line (chord) distance orders dealers the same way as the
+great-circle distance. The points are stored twice, grouped by state and
+grouped by cell of a uniform 3-D grid (``settings.DEALER_GRID_KM``), so
+a state or a cell is one contiguous slice. ``nearest`` measures the
+query point against the occupied cell centers, bounds the distance of
+the n-th nearest dealer from the nearest cells, and then measures only
+the dealers in cells that can lie within that bound; the result is
+exact. With a state filter it measures those states' slices instead.
+
+Dealers without a usable lat/long are still listed by state (after the
+located ones of their state) but are left off the grid and never
+returned by ``nearest``.
+"""
+
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from . import restapis
+from .backend_cache import cached_get_request
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    cos_lat = np.cos(lat)
+    return np.stack(
+        [cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1
+    )
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord, 2.0) / 2)
+
+
+def _state_names(states):
+    return [s.strip().lower() for s in states if s and s.strip()]
+
+
+class DealerIndex:
+    """State map and spatial grid over a list of dealer dicts."""
+
+    def __init__(self, dealers, cell_km=None):
+        self.dealers = list(dealers)
+        self.size = len(self.dealers)
+        located = np.array(
+            [_has_location(d) for d in self.dealers], dtype=bool
+        )
+        self.located = int(located.sum())
+        lat = np.array([
+            float(d["lat"]) if ok else np.nan
+            for d, ok in zip(self.dealers, located.tolist())
+        ])
+        lon = np.array([
+            float(d["long"]) if ok else np.nan
+            for d, ok in zip(self.dealers, located.tolist())
+        ])
+        points = _unit_vectors(lat, lon).reshape(-1, 3)
+
+        # Rows grouped by state, located dealers first; state name or
+        # code (lower case) -> (start, located stop, stop) of its group
+        names = [
+            str(d.get("state", "")).strip().lower() for d in self.dealers
+        ]
+        self.state_rows = np.array(
+            sorted(
+                range(self.size),
+                key=lambda row: (names[row], not located[row]),
+            ),
+            dtype=np.int32,
+        )
+        self.state_points = points[self.state_rows]
+        self.states = {}
+        start = 0
+        for stop in range(1, self.size + 1):
+            if stop == self.size or (
+                names[self.state_rows[stop]] != names[self.state_rows[start]]
+            ):
+                dealer = self.dealers[self.state_rows[start]]
+                located_stop = start + int(
+                    located[self.state_rows[start:stop]].sum()
+                )
+                for name in _state_names(
+                    [names[self.state_rows[start]], str(dealer.get("st", ""))]
+                ):
+                    self.states[name] = (start, located_stop, stop)
+                start = stop
+
+        # zip code and 3-digit zip prefix -> mean (lat, long) of dealers
+        self.zips = {}
+        for key_len in (None, 3):
+            groups = {}
+            for row, dealer in enumerate(self.dealers):
+                code = str(dealer.get("zip", "")).strip()
+                if code and located[row]:
+                    groups.setdefault(code[:key_len], []).append(row)
+            for code, found in groups.items():
+                self.zips.setdefault(
+                    code, (float(lat[found].mean()), float(lon[found].mean()))
+                )
+
+        # Rows grouped by grid cell, with each cell's (start, count)
+        # (located dealers only)
+        self.cell = (cell_km or settings.DEALER_GRID_KM) / EARTH_RADIUS_KM
+        grid_rows = np.flatnonzero(located)
+        cells = np.floor((points[grid_rows] + 1) / self.cell).astype(np.int64)
+        size = int(cells.max(initial=0)) + 1
+        keys = (cells[:, 0] * size + cells[:, 1]) * size + cells[:, 2]
+        order = np.argsort(keys, kind="stable")
+        self.cell_rows = grid_rows[order].astype(np.int32)
+        self.cell_points = points[self.cell_rows]
+        _, self.starts, self.counts = np.unique(
+            keys[order], return_index=True, return_counts=True
+        )
+        centers = (cells[order[self.starts]] + 0.5) * self.cell - 1
+        self.centers = np.ascontiguousarray(centers)
+        self.center_norms = (centers * centers).sum(axis=1)
+        # Distance from a cell's center to its corners
+        self.reach = self.cell * np.sqrt(3) / 2
+
+    def _slices(self, states):
+        return sorted({
+            self.states[name]
+            for name in _state_names(states)
+            if name in self.states
+        })
+
+    def in_states(self, states):
+        """Dealers in any of ``states`` (names or codes), in feed order."""
+        slices = self._slices(states)
+        if not slices:
+            return []
+        rows = np.sort(
+            np.concatenate([self.state_rows[a:b] for a, _, b in slices])
+        )
+        return [self.dealers[row] for row in rows.tolist()]
+
+    def locate_zip(self, code):
+        """(lat, long) for a zip code, from the dealers that share it.
+
+        Falls back to the dealers in the same 3-digit zip prefix; returns
+        None when neither is known.
+        """
+        code = str(code).strip()
+        return self.zips.get(code) or self.zips.get(code[:3])
+
+    def nearest(self, lat, lon, n=5, states=None):
+        """Return up to ``n`` (dealer, distance_km) pairs, nearest first.
+
+        ``states`` limits the search to dealers in those states.
+        """
+        if n <= 0 or not self.located:
+            return []
+        point = _unit_vectors(float(lat), float(lon))
+        if states:
+            # Each state's points are contiguous, so measure them directly
+            slices = [(a, b) for a, b, _ in self._slices(states) if b > a]
+            if not slices:
+                return []
+            return self._closest(
+                point,
+                [self.state_rows[a:b] for a, b in slices],
+                [self.state_points[a:b] for a, b in slices],
+                n,
+            )
+        return self._search(point, n)
+
+    def _closest(self, point, rows, points, n):
+        rows = np.concatenate(rows)
+        # For unit vectors, the largest dot product is the nearest point
+        dots = np.concatenate(points) @ point
+        if len(rows) > n:
+            top = np.argpartition(-dots, n - 1)[:n]
+            rows, dots = rows[top], dots[top]
+        rank = np.argsort(-dots, kind="stable")
+        chord = np.sqrt(np.maximum(2 - 2 * dots[rank], 0))
+        return [
+            (self.dealers[row], float(km))
+            for row, km in zip(rows[rank].tolist(), _chord_to_km(chord))
+        ]
+
+    def _search(self, point, n):
+        # Squared distances, |c|^2 - 2 c.p + |p|^2 with |p| = 1
+        to_center = self.center_norms - 2 * (self.centers @ point) + 1
+        # The n-th nearest dealer is no farther than the far corner of the
+        # nearest cells that together hold n dealers...
+        nearby = min(len(to_center), 64)
+        order = np.argpartition(to_center, nearby - 1)[:nearby]
+        order = order[np.argsort(to_center[order])]
+        held = np.cumsum(self.counts[order])
+        if held[-1] < n and nearby < len(to_center):
+            order = np.argsort(to_center)
+            held = np.cumsum(self.counts[order])
+        last = order[min(held.searchsorted(n), len(held) - 1)]
+        limit = np.sqrt(max(to_center[last], 0)) + 2 * self.reach
+        # ...so only cells whose near corner is within that can hold it
+        cells = np.flatnonzero(to_center <= limit * limit)
+        spans = [
+            (start, start + count)
+            for start, count in zip(
+                self.starts[cells].tolist(), self.counts[cells].tolist()
+            )
+        ]
+        return self._closest(
+            point,
+            [self.cell_rows[a:b] for a, b in spans],
+            [self.cell_points[a:b] for a, b in spans],
+            n,
+        )
+
+
+def _has_location(dealer):
+    try:
+        float(dealer["lat"]), float(dealer["long"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return True
+
+
+_lock = threading.Lock()
+_index = None
+_built_at = 0.0
+_refreshing = False
+
+
+def _build():
+    dealers = cached_get_request("/fetchDealers", "dealers")
+    if not isinstance(dealers, list):
+        return None
+    return DealerIndex(dealers)
+
+
+def _refresh():
+    global _index, _built_at, _refreshing
+    try:
+        index = _build()
+        if index is not None:
+            _index, _built_at = index, time.monotonic()
+    finally:
+        _refreshing = False
+
+
+def get_dealer_index():
+    """Return the shared index, or None while the feed is unavailable."""
+    global _index, _built_at, _refreshing
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = _build()
+                _built_at = time.monotonic()
+        return _index
+    if time.monotonic() - _built_at > settings.DEALER_INDEX_REFRESH:
+        with _lock:
+            if not _refreshing:
+                _refreshing = True
+                restapis._executor.submit(_refresh)
+    return _index
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the work factor from ``PASSWORD_HASH_ITERATIONS``.
+
+    The algorithm name is unchanged, so existing hashes keep verifying
+    and are re-encoded at the configured iteration count on next login.
+    See ``benchmarks/login.py`` for choosing the value.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
@@ -0,0 +1,254 @@
+"""Per-route HTTP cache policies, strong ETags, 304s and compression.
+
+Views declare how clients may cache them with ``@cache_policy(...)``;
+JSON responses from views without a declaration get ``DEFAULT_POLICY``
+(store, but revalidate every time). ``HttpCacheMiddleware`` sets
+``Cache-Control`` from the policy on 200 and 304 responses, unless the
+view set one (views mark fallbacks for a failed upstream call with
+``no_store``); error statuses get "no-store". Then, for a 200 GET or
+HEAD, it:
+
+* keeps the view's ETag (e.g. the catalog's version hash) or derives a
+  strong one from a BLAKE2 hash of the body;
+* picks an encoding from ``Accept-Encoding`` (brotli when the module is
+  installed, else gzip) for bodies of at least
+  ``settings.COMPRESS_MIN_SIZE`` bytes. Each encoding is a separate
+  representation with its own strong ETag ("<tag>-gzip");
+* answers 304 when ``If-None-Match`` names that representation, before
+  compressing anything;
+* compresses deterministically, so equal bodies give equal bytes, and
+  keeps recent compressed bodies by ETag so a popular listing is only
+  compressed once.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+GZIP_LEVEL = 6
+# Brotli's middle qualities are about as fast as gzip -6 and smaller
+BROTLI_QUALITY = 5
+# Total bytes of compressed bodies kept for reuse
+COMPRESSED_CACHE_BYTES = 16 * 2**20
+
+
+class CachePolicy:
+    """How clients and shared caches may keep one route's responses."""
+
+    __slots__ = ("max_age", "public", "no_store", "compress", "etag")
+
+    def __init__(self, max_age=0, public=False, no_store=False,
+                 compress=True, etag=True):
+        self.max_age = max_age
+        self.public = public
+        self.no_store = no_store
+        self.compress = compress
+        self.etag = etag
+
+    def cache_control(self):
+        if self.no_store:
+            return "no-store"
+        scope = "public" if self.public else "private"
+        if self.max_age:
+            return f"{scope}, max-age={self.max_age}"
+        return f"{scope}, no-cache"
+
+
+DEFAULT_POLICY = CachePolicy()
+
+
+def cache_policy(**kwargs):
+    """Declare a view's ``CachePolicy``: ``@cache_policy(max_age=60)``."""
+    policy = CachePolicy(**kwargs)
+
+    def decorator(view):
+        view.cache_policy = policy
+        return view
+
+    return decorator
+
+
+def no_store(response):
+    """Keep a fallback response (e.g. the backend was down) out of caches.
+
+    Overrides the route's policy for this one response.
+    """
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def accepted_encodings(header):
+    """Codings an ``Accept-Encoding`` value allows (q > 0), lower case."""
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q=") and float(params[2:] or 0) == 0:
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding):
+    """"br", "gzip" or None for an ``Accept-Encoding`` header value."""
+    try:
+        accepted = accepted_encodings(accept_encoding)
+    except ValueError:
+        return None
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def variant_etag(etag, encoding):
+    """The ETag of ``etag``'s representation in ``encoding``."""
+    if not encoding:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+class _CompressedCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes // 4:
+            return
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, old = self.entries.popitem(last=False)
+                self.size -= len(old)
+
+
+_compressed = _CompressedCache(COMPRESSED_CACHE_BYTES)
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _policy(request, response):
+    match = getattr(request, "resolver_match", None)
+    policy = getattr(match.func, "cache_policy", None) if match else None
+    if policy is None and response.get("Content-Type", "").startswith(
+        "application/json"
+    ):
+        policy = DEFAULT_POLICY
+    return policy
+
+
+def apply(request, response):
+    """Apply the route's policy to ``response``; may return a 304."""
+    policy = _policy(request, response)
+    if policy is None:
+        return response
+    if response.status_code not in (200, 304):
+        # Errors are not what the route's policy describes; never share them
+        if "Cache-Control" not in response:
+            response["Cache-Control"] = "no-store"
+        return response
+    if "Cache-Control" not in response:
+        response["Cache-Control"] = policy.cache_control()
+    if response.status_code == 304:
+        # A view's own 304 revalidates the entry the policy describes
+        return response
+    if (
+        policy.no_store
+        or "no-store" in response["Cache-Control"]
+        or request.method not in ("GET", "HEAD")
+        or response.streaming
+        or response.has_header("Content-Encoding")
+    ):
+        return response
+
+    body = response.content
+    encoding = None
+    if policy.compress and len(body) >= settings.COMPRESS_MIN_SIZE:
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(
+            request.headers.get("Accept-Encoding", "")
+        )
+
+    etag = response.get("ETag")
+    if etag is None and policy.etag:
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+    if etag is not None:
+        etag = response["ETag"] = variant_etag(etag, encoding)
+        # If-None-Match uses the weak comparison: W/"x" matches "x"
+        client_etags = {
+            tag.removeprefix("W/")
+            for tag in parse_etags(request.headers.get("If-None-Match", ""))
+        }
+        if etag in client_etags or "*" in client_etags:
+            not_modified = HttpResponseNotModified()
+            for header in ("ETag", "Cache-Control", "Vary"):
+                if header in response:
+                    not_modified[header] = response[header]
+            not_modified.cookies = response.cookies
+            return not_modified
+
+    if encoding:
+        compressed = _compressed.get(etag) if etag else None
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if etag:
+                _compressed.put(etag, compressed)
+        response.content = compressed
+        response["Content-Encoding"] = encoding
+        response["Content-Length"] = str(len(compressed))
+    return response
+
+
+class HttpCacheMiddleware:
+    """Apply ``cache_policy`` declarations; see the module docstring.
+
+    Put it right after ``RequestMetricsMiddleware`` so it sees the final
+    headers of every inner middleware. Works under WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return apply(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return apply(request, await self.get_response(request))
@@ -0,0 +1,240 @@
+"""In-memory dealer inventory over ``database/data/car_records.json``.
+
+Records (``dealer_id``, ``make``, ``model``, ``bodyType``, ``year``,
+``mileage``, as in ``database/inventory.js``) are held column by column
+in NumPy arrays; make, model and bodyType are dictionary-encoded into
+small integer codes. A row's position is its id.
+
+Every filterable column has a sorted index: a stable argsort of the
+column plus the sorted keys. An equality or range predicate maps to one
+contiguous slice of the index with two binary searches, so ``query``
+starts from the narrowest slice among its predicates and only checks the
+remaining predicates against those candidate rows.
+"""
+
+import array
+import os
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from .loader import iter_json_array
+
+
+def _code_dtype(size):
+    for dtype in (np.uint8, np.uint16):
+        if size <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint32
+
+
+class _Dictionary:
+    """Maps distinct strings to dense integer codes and back."""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class _SortedIndex:
+    def __init__(self, column):
+        self.order = np.argsort(column, kind="stable").astype(np.int32)
+        self.keys = column[self.order]
+
+    def _key(self, value):
+        # A probe of another dtype would make searchsorted convert (copy)
+        # the whole key array, so clamp it into the keys' own dtype
+        info = np.iinfo(self.keys.dtype)
+        return self.keys.dtype.type(min(max(value, info.min), info.max))
+
+    def span(self, low=None, high=None):
+        """Return (start, stop) of the rows with low <= key <= high."""
+        keys = self.keys
+        info = np.iinfo(keys.dtype)
+        if (low is not None and low > info.max) or (
+            high is not None and high < info.min
+        ):
+            return 0, 0
+        start = 0 if low is None else keys.searchsorted(self._key(low))
+        stop = (
+            len(keys)
+            if high is None
+            else keys.searchsorted(self._key(high), "right")
+        )
+        return int(start), int(max(start, stop))
+
+
+class Inventory:
+    """Columnar car records with sorted indexes for filtered queries."""
+
+    def __init__(self, dealer_id, make, model, body_type, year, mileage,
+                 makes, models, body_types):
+        self.makes = _Dictionary(makes)
+        self.models = _Dictionary(models)
+        self.body_types = _Dictionary(body_types)
+        self.columns = {
+            "dealer_id": np.asarray(dealer_id, dtype=np.int32),
+            "make": np.asarray(make, dtype=_code_dtype(len(makes))),
+            "model": np.asarray(model, dtype=_code_dtype(len(models))),
+            "bodyType": np.asarray(
+                body_type, dtype=_code_dtype(len(body_types))
+            ),
+            "year": np.asarray(year, dtype=np.int16),
+            "mileage": np.asarray(mileage, dtype=np.int32),
+        }
+        self.size = len(self.columns["dealer_id"])
+        self.indexes = {
+            name: _SortedIndex(self.columns[name])
+            for name in ("dealer_id", "make", "model", "year", "mileage")
+        }
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from an iterable of car record dicts."""
+        makes, models, body_types = _Dictionary(), _Dictionary(), _Dictionary()
+        dealer_id, make, model = (array.array("l") for _ in range(3))
+        body_type, year, mileage = (array.array("l") for _ in range(3))
+        for record in records:
+            dealer_id.append(record["dealer_id"])
+            make.append(makes.encode(record["make"]))
+            model.append(models.encode(record["model"]))
+            body_type.append(body_types.encode(record["bodyType"]))
+            year.append(record["year"])
+            mileage.append(record["mileage"])
+        return cls(
+            dealer_id, make, model, body_type, year, mileage,
+            makes.values, models.values, body_types.values,
+        )
+
+    def nbytes(self):
+        """Bytes held by the columns and indexes."""
+        total = sum(column.nbytes for column in self.columns.values())
+        for index in self.indexes.values():
+            total += index.order.nbytes + index.keys.nbytes
+        return total
+
+    def _predicates(self, dealer_id, make, model, year_min, year_max,
+                    mileage_min, mileage_max):
+        """Return [(column, low, high)], or None if nothing can match."""
+        predicates = []
+        if dealer_id is not None:
+            predicates.append(("dealer_id", dealer_id, dealer_id))
+        for name, dictionary, value in (
+            ("make", self.makes, make),
+            ("model", self.models, model),
+        ):
+            if value is not None:
+                code = dictionary.codes.get(value)
+                if code is None:
+                    return None
+                predicates.append((name, code, code))
+        if year_min is not None or year_max is not None:
+            predicates.append(("year", year_min, year_max))
+        if mileage_min is not None or mileage_max is not None:
+            predicates.append(("mileage", mileage_min, mileage_max))
+        return predicates
+
+    def query(self, dealer_id=None, make=None, model=None, year_min=None,
+              year_max=None, mileage_min=None, mileage_max=None, limit=50,
+              after=None):
+        """Return (rows, next_cursor) for cars matching every filter.
+
+        Rows come in id order; pass ``next_cursor`` back as ``after`` for
+        the next page (it is None on the last one).
+        """
+        predicates = self._predicates(
+            dealer_id, make, model, year_min, year_max,
+            mileage_min, mileage_max,
+        )
+        if predicates is None:
+            return [], None
+        first_id = 0 if after is None else max(after + 1, 0)
+
+        if not predicates:
+            stop = min(self.size, first_id + limit + 1)
+            ids = np.arange(first_id, max(first_id, stop), dtype=np.int32)
+        else:
+            # Start from the narrowest index slice
+            spans = [
+                (self.indexes[name].span(low, high), name, low, high)
+                for name, low, high in predicates
+            ]
+            (start, stop), name, low, high = min(
+                spans, key=lambda s: s[0][1] - s[0][0]
+            )
+            candidates = self.indexes[name].order[start:stop]
+            if low != high:
+                # A range slice is in key order, not id order
+                candidates = np.sort(candidates)
+            candidates = candidates[candidates.searchsorted(first_id):]
+            rest = [p for p in predicates if p[0] != name]
+            ids = self._filter(candidates, rest, limit + 1)
+
+        rows = [self._row(int(i)) for i in ids[:limit]]
+        next_cursor = str(rows[-1]["id"]) if len(ids) > limit else None
+        return rows, next_cursor
+
+    def _filter(self, candidates, predicates, wanted):
+        # Check the candidates block by block so a small page stops early
+        if not predicates:
+            return candidates[:wanted]
+        found = []
+        count = 0
+        block = max(4096, wanted * 8)
+        for offset in range(0, len(candidates), block):
+            ids = candidates[offset:offset + block]
+            mask = np.ones(len(ids), dtype=bool)
+            for name, low, high in predicates:
+                values = self.columns[name][ids]
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+            found.append(ids[mask])
+            count += len(found[-1])
+            if count >= wanted:
+                break
+        if not found:
+            return candidates[:0]
+        return np.concatenate(found)[:wanted]
+
+    def _row(self, i):
+        columns = self.columns
+        return {
+            "id": i,
+            "dealer_id": int(columns["dealer_id"][i]),
+            "make": self.makes.values[columns["make"][i]],
+            "model": self.models.values[columns["model"][i]],
+            "bodyType": self.body_types.values[columns["bodyType"][i]],
+            "year": int(columns["year"][i]),
+            "mileage": int(columns["mileage"][i]),
+        }
+
+
+_lock = threading.Lock()
+_inventory = None
+_loaded_mtime = None
+
+
+def get_inventory():
+    """Return the shared inventory, (re)loading it if the file changed."""
+    global _inventory, _loaded_mtime
+    path = settings.INVENTORY_PATH
+    mtime = os.stat(path).st_mtime_ns
+    if _inventory is None or mtime != _loaded_mtime:
+        with _lock:
+            if _inventory is None or mtime != _loaded_mtime:
+                with open(path, encoding="utf-8") as fh:
+                    _inventory = Inventory.from_records(
+                        iter_json_array(fh, key="cars")
+                    )
+                _loaded_mtime = mtime
+    return _inventory
@@ -0,0 +1,170 @@
+"""Bulk, idempotent loading of car catalog records.
+
+Records use the ``database/data/car_records.json`` shape
+(``make``, ``model``, ``bodyType``, ``year``, ``dealer_id``). They are
+written with chunked ``bulk_create`` upserts keyed on the natural keys
+declared on ``CarMake`` and ``CarModel``, inside one transaction, so a
+load can be rerun (or race another one) without creating duplicates.
+"""
+
+import json
+
+from django.db import transaction
+
+from . import catalog
+from .models import CarMake, CarModel
+
+CAR_TYPES = {key for key, _ in CarModel.CAR_TYPES}
+# Body types in the records that are not CarModel choices, mapped to the
+# nearest choice. Records with any other type are skipped and counted.
+BODY_TYPE_ALIASES = {
+    "CONVERTIBLE": "COUPE",
+    "HATCHBACK": "WAGON",
+    "MINIVAN": "WAGON",
+    "PICKUP": "TRUCK",
+}
+
+
+def iter_json_array(fh, key=None, read_size=1 << 16):
+    """Yield the items of a top-level JSON array without loading it all.
+
+    With ``key``, the array is the value of that key in a top-level
+    object (``{"cars": [...]}``); only the part of the document before
+    the array is scanned for it.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+
+    def fill():
+        nonlocal buf, pos
+        chunk = fh.read(read_size)
+        buf = buf[pos:] + chunk
+        pos = 0
+        return bool(chunk)
+
+    # Find the opening bracket of the array
+    marker = "[" if key is None else f'"{key}"'
+    while True:
+        found = buf.find(marker, pos)
+        if found != -1:
+            pos = found + len(marker)
+            break
+        pos = max(0, len(buf) - len(marker))
+        if not fill():
+            raise ValueError(f"no {marker} found in input")
+    if key is not None:
+        while True:
+            found = buf.find("[", pos)
+            if found != -1:
+                pos = found + 1
+                break
+            pos = len(buf)
+            if not fill():
+                raise ValueError(f"no array found for {marker}")
+
+    while True:
+        # Skip separators; stop at the closing bracket
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buf):
+            if not fill():
+                raise ValueError("unterminated array")
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # The item is split across reads
+            if not fill():
+                raise
+            continue
+        yield item
+        pos = end
+
+
+def _chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _car_type(body_type):
+    """The CarModel type for a record's bodyType, or None if unknown."""
+    value = str(body_type or "SUV").strip().upper()
+    value = BODY_TYPE_ALIASES.get(value, value)
+    return value if value in CAR_TYPES else None
+
+
+def load_makes(makes):
+    """Upsert ``{"name", "description"}`` dicts; return ``{name: id}``."""
+    CarMake.objects.bulk_create(
+        [
+            CarMake(name=m["name"], description=m.get("description", ""))
+            for m in makes
+        ],
+        update_conflicts=True,
+        unique_fields=["name"],
+        update_fields=["description"],
+    )
+    names = [m["name"] for m in makes]
+    return dict(
+        CarMake.objects.filter(name__in=names).values_list("name", "id")
+    )
+
+
+def load_cars(records, chunk_size=5000):
+    """Upsert car records in chunks inside a single transaction.
+
+    ``records`` may be any iterable, including ``iter_json_array`` over a
+    large file. Makes are created on first sight (existing descriptions
+    are kept); models are upserted on (make, name, year, dealer_id) with
+    their type updated. Records whose bodyType is not a CarModel type
+    (see ``BODY_TYPE_ALIASES``) are skipped. Returns ``(loaded, skipped)``
+    record counts.
+    """
+    make_ids = dict(CarMake.objects.values_list("name", "id"))
+    total = skipped = 0
+    with transaction.atomic():
+        for chunk in _chunks(records, chunk_size):
+            typed = [(r, _car_type(r.get("bodyType"))) for r in chunk]
+            chunk = [(r, car_type) for r, car_type in typed if car_type]
+            skipped += len(typed) - len(chunk)
+            if not chunk:
+                continue
+            new_makes = {r["make"] for r, _ in chunk} - make_ids.keys()
+            if new_makes:
+                CarMake.objects.bulk_create(
+                    [CarMake(name=name, description="") for name in new_makes],
+                    ignore_conflicts=True,
+                )
+                make_ids.update(
+                    CarMake.objects.filter(name__in=new_makes).values_list(
+                        "name", "id"
+                    )
+                )
+            CarModel.objects.bulk_create(
+                [
+                    CarModel(
+                        car_make_id=make_ids[r["make"]],
+                        name=r["model"],
+                        type=car_type,
+                        year=r["year"],
+                        dealer_id=r.get("dealer_id", 0),
+                    )
+                    for r, car_type in chunk
+                ],
+                update_conflicts=True,
+                unique_fields=["car_make", "name", "year", "dealer_id"],
+                update_fields=["type"],
+            )
+            total += len(chunk)
+        # bulk_create sends no post_save signals
+        transaction.on_commit(catalog.invalidate)
+    return total, skipped
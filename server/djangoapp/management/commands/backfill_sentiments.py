@@ -0,0 +1,65 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp.sentiment_cache import get_sentiments
+
+
+class Command(BaseCommand):
+    help = (
+        "Score every review in a reviews JSON file in bulk and store the "
+        "labels in the sentiment cache. With --write-back, also add a "
+        "'sentiment' field to each review in the file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=os.path.join(
+                settings.BASE_DIR, "database", "data", "reviews.json"
+            ),
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--write-back", action="store_true")
+
+    def handle(self, *args, **options):
+        path = options["file"]
+        try:
+            with open(path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+
+        reviews = data["reviews"]
+        chunk_size = options["chunk_size"]
+        unscored = 0
+        for start in range(0, len(reviews), chunk_size):
+            chunk = reviews[start:start + chunk_size]
+            labels = get_sentiments(
+                [r.get("review", "") for r in chunk], default=None
+            )
+            for review, label in zip(chunk, labels):
+                if label is None:
+                    unscored += 1
+                elif options["write_back"]:
+                    review["sentiment"] = label
+            self.stdout.write(
+                f"Scored {min(start + chunk_size, len(reviews))}"
+                f"/{len(reviews)} reviews"
+            )
+
+        if options["write_back"]:
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, indent=2)
+                fh.write("\n")
+
+        if unscored:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{unscored} reviews could not be scored; rerun to retry."
+                )
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("All reviews scored."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from djangoapp.backend_cache import invalidate
+
+
+class Command(BaseCommand):
+    help = (
+        "Invalidate cached dealer responses from the Express backend. "
+        "Pass endpoints (e.g. /fetchDealer/3) to drop only those. "
+        "Needs a shared cache (file or redis) to reach running servers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("endpoints", nargs="*")
+
+    def handle(self, *args, **options):
+        invalidate(*options["endpoints"])
+        self.stdout.write(self.style.SUCCESS("Backend cache invalidated."))
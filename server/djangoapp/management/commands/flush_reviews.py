@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp import review_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Send every review waiting in the review spool to the backend now, "
+        "e.g. before retiring a host whose spool is not empty."
+    )
+
+    def handle(self, *args, **options):
+        sent = review_queue.flush()
+        left = review_queue.pending()
+        dead = review_queue.dead_lettered()
+        if dead:
+            self.stderr.write(
+                f"{dead} reviews the backend rejected are kept in the "
+                "spool's dead_letter table."
+            )
+        if left:
+            raise CommandError(
+                f"Sent {sent} reviews; {left} still waiting (backend "
+                "unavailable or batch rejected), rerun to retry."
+            )
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} reviews."))
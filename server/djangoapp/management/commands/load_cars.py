@@ -0,0 +1,40 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp.loader import iter_json_array, load_cars
+
+
+class Command(BaseCommand):
+    help = (
+        "Load car records ({\"cars\": [...]}) into the catalog with chunked "
+        "bulk upserts. Safe to rerun: existing cars are updated, not "
+        "duplicated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=os.path.join(
+                settings.BASE_DIR, "database", "data", "car_records.json"
+            ),
+        )
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            with open(path, encoding="utf-8") as fh:
+                total, skipped = load_cars(
+                    iter_json_array(fh, key="cars"),
+                    chunk_size=options["chunk_size"],
+                )
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot load {path}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Loaded {total} car records."))
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {skipped} records with an unknown bodyType."
+            ))
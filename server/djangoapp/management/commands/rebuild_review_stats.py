@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoapp import review_stats
+from djangoapp.restapis import get_request
+from djangoapp.sentiment_cache import get_sentiments
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every dealer's review aggregates from all reviews in "
+        "the backend (or in a reviews JSON file with --file). Reviews "
+        "without a stored sentiment are scored through the sentiment "
+        "cache; those the analyzer cannot score are left out. Run while "
+        "the review queue is idle: batches flushed during the rebuild "
+        "may be missed or counted twice."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", help="reviews JSON file to read")
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            try:
+                with open(options["file"], encoding="utf-8") as fh:
+                    reviews = json.load(fh)["reviews"]
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f"Cannot read {options['file']}: {exc}")
+        else:
+            reviews = get_request("/fetchReviews")
+            if not isinstance(reviews, list):
+                raise CommandError("Could not fetch reviews from the backend")
+
+        unscored = [r for r in reviews if not r.get("sentiment")]
+        labels = get_sentiments(
+            [r.get("review", "") for r in unscored], default=None
+        )
+        for review, label in zip(unscored, labels):
+            review["sentiment"] = label
+
+        dealers = review_stats.rebuild(reviews)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt aggregates for {dealers} dealers from "
+                f"{len(reviews)} reviews."
+            )
+        )
@@ -0,0 +1,300 @@
+"""Request-level performance metrics.
+
+``RequestMetricsMiddleware`` (see ``middleware.py``) opens a
+``RequestStats`` for each request in a context variable. While it is
+open, database queries (through a connection execute wrapper) and
+outbound calls (through ``upstream_call`` in ``restapis`` and
+``async_restapis``) add their count and time to it. When the response is
+ready the totals go into the process-wide histograms below, a
+``Server-Timing`` header and one structured log line.
+
+``render`` returns these and any other metrics defined with the classes
+below (e.g. the circuit breakers in ``restapis``) in the Prometheus text
+format for the ``/metrics`` endpoint. Each worker process keeps its own
+registry.
+"""
+
+import bisect
+import contextvars
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+# Queries or calls made by a single request
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_registry = []
+
+
+def _escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """A Prometheus histogram with a fixed set of label names."""
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, *labels):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [
+                    [0] * (len(self.buckets) + 1), 0.0
+                ]
+            series[0][slot] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(
+                (labels, list(counts), total)
+                for labels, (counts, total) in self._series.items()
+            )
+        for labels, counts, total in series:
+            cumulative = 0
+            bounds = [repr(float(b)) for b in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {total!r}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return "\n".join(lines)
+
+
+class Counter:
+    """A Prometheus counter with a fixed set of label names."""
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}{label_str} {value}")
+        return "\n".join(lines)
+
+
+class Gauge(Counter):
+    """A Prometheus gauge; ``set`` replaces the value."""
+
+    type = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+REQUEST_SECONDS = Histogram(
+    "django_request_duration_seconds",
+    "Wall time from the first middleware to the response.",
+    ("route", "method", "status"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "django_request_db_queries",
+    "Database queries made by one request.",
+    ("route",),
+    COUNT_BUCKETS,
+)
+DB_QUERY_SECONDS = Histogram(
+    "django_db_query_duration_seconds",
+    "Time spent executing one database query.",
+)
+UPSTREAM_SECONDS = Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of one outbound HTTP call.",
+    ("upstream", "outcome"),
+)
+REQUEST_UPSTREAM_CALLS = Histogram(
+    "django_request_upstream_calls",
+    "Outbound HTTP calls made by one request, per upstream.",
+    ("route", "upstream"),
+    COUNT_BUCKETS,
+)
+
+
+def render():
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+class RequestStats:
+    """Counters for one request; safe to update from pool threads."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        # upstream -> [calls, seconds]
+        self.upstreams = {}
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds):
+        with self._lock:
+            self.db_queries += 1
+            self.db_seconds += seconds
+
+    def add_call(self, upstream, seconds):
+        with self._lock:
+            totals = self.upstreams.setdefault(upstream, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+def request_elapsed():
+    """Seconds since the current request started, or None outside one."""
+    stats = _current.get()
+    if stats is None:
+        return None
+    return time.perf_counter() - stats.started
+
+
+def start_request():
+    """Open stats for the current request; returns (stats, reset token)."""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+class upstream_call:
+    """Time an outbound call: ``with upstream_call("backend"): ...``.
+
+    A call that raises is recorded with outcome "error".
+    """
+
+    __slots__ = ("upstream", "started")
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        outcome = "ok" if exc_type is None else "error"
+        UPSTREAM_SECONDS.observe(elapsed, self.upstream, outcome)
+        stats = _current.get()
+        if stats is not None:
+            stats.add_call(self.upstream, elapsed)
+        return False
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        DB_QUERY_SECONDS.observe(elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.add_query(elapsed)
+
+
+def install_db_wrapper(sender, connection, **kwargs):
+    """``connection_created`` receiver that times every query."""
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
+
+
+def finish_request(request, response, stats, server_timing=True):
+    """Record ``stats`` for a finished request and annotate ``response``."""
+    elapsed = time.perf_counter() - stats.started
+    match = getattr(request, "resolver_match", None)
+    route = match.route if match is not None else "unmatched"
+    REQUEST_SECONDS.observe(
+        elapsed, route, request.method, str(response.status_code)
+    )
+    REQUEST_DB_QUERIES.observe(stats.db_queries, route)
+    for upstream, (calls, _) in stats.upstreams.items():
+        REQUEST_UPSTREAM_CALLS.observe(calls, route, upstream)
+
+    if server_timing:
+        entries = [
+            f"total;dur={elapsed * 1000:.1f}",
+            f'db;desc="queries={stats.db_queries}";'
+            f"dur={stats.db_seconds * 1000:.1f}",
+        ]
+        for upstream, (calls, seconds) in sorted(stats.upstreams.items()):
+            entries.append(
+                f'{upstream};desc="calls={calls}";dur={seconds * 1000:.1f}'
+            )
+        response["Server-Timing"] = ", ".join(entries)
+
+    logger.info(
+        "request finished",
+        extra={
+            "route": route,
+            "method": request.method,
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 1),
+            "db_queries": stats.db_queries,
+            "db_ms": round(stats.db_seconds * 1000, 1),
+            "upstreams": {
+                upstream: {"calls": calls, "ms": round(seconds * 1000, 1)}
+                for upstream, (calls, seconds) in stats.upstreams.items()
+            },
+        },
+    )
+    return response
@@ -1,10 +1,43 @@
-from flask import Flask
-from nltk.sentiment import SentimentIntensityAnalyzer
+from flask import Flask, request
 import json
+import os
+import threading
+
+from lexicon import build_analyzer, label
 
 app = Flask("Sentiment Analyzer")
 
-sia = SentimentIntensityAnalyzer()
+# Built on first use or by the warm-up thread started below
+sia = None
+_sia_lock = threading.Lock()
+
+
+def get_analyzer():
+    global sia
+    if sia is None:
+        with _sia_lock:
+            if sia is None:
+                sia = build_analyzer()
+    return sia
+
+
+def warm():
+    """Load the lexicon in the background so /ready flips early."""
+    threading.Thread(target=get_analyzer, daemon=True).start()
+
+
+if os.getenv("SENTIMENT_PREWARM", "1") == "1":
+    warm()
+
+# Upper bound on texts accepted by a single /analyze_batch call
+MAX_BATCH_SIZE = 1000
+
+
+def classify(text):
+    scores = get_analyzer().polarity_scores(text)
+    return label(
+        float(scores["pos"]), float(scores["neg"]), float(scores["neu"])
+    )
 
 
 @app.get("/")
@@ -13,23 +46,31 @@ def home():
     Use /analyze/text to get the sentiment"
 
 
+@app.get("/ready")
+def ready():
+    # Readiness probe: only report ready once the lexicon is loaded
+    if sia is None:
+        return {"ready": False}, 503
+    return {"ready": True}
+
+
 @app.get("/analyze/<input_txt>")
 def analyze_sentiment(input_txt):
 
-    scores = sia.polarity_scores(input_txt)
-    print(scores)
-    pos = float(scores["pos"])
-    neg = float(scores["neg"])
-    neu = float(scores["neu"])
-    res = "positive"
-    print("pos neg nue ", pos, neg, neu)
-    if neg > pos and neg > neu:
-        res = "negative"
-    elif neu > neg and neu > pos:
-        res = "neutral"
-    res = json.dumps({"sentiment": res})
-    print(res)
-    return res
+    return json.dumps({"sentiment": classify(input_txt)})
+
+
+@app.post("/analyze_batch")
+def analyze_sentiment_batch():
+    payload = request.get_json(silent=True)
+    texts = payload.get("texts") if isinstance(payload, dict) else None
+    if not isinstance(texts, list):
+        return {"error": "Expected a JSON body with a 'texts' list"}, 400
+    if len(texts) > MAX_BATCH_SIZE:
+        return {"error": f"At most {MAX_BATCH_SIZE} texts per batch"}, 413
+
+    sentiments = [classify(str(text or "")) for text in texts]
+    return {"sentiments": sentiments}
 
 
 if __name__ == "__main__":
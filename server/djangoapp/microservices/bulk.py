@@ -0,0 +1,202 @@
+"""Vectorized bulk sentiment labeling for backfills and analytics.
+
+``label_texts`` gives the same labels as ``app.classify`` (VADER scores
+plus ``lexicon.label``) for a whole corpus at once:
+
+1. Every text is tokenized once, the way VADER's ``SentiText`` does it,
+   and each distinct lowercased token gets an integer id.
+2. A valence array indexed by token id turns the corpus into one flat
+   NumPy array of valences; per-text pos/neg/neu sums are computed with
+   ``np.bincount`` and labeled with array comparisons.
+
+Only context-free texts take the vectorized path. Texts containing
+anything VADER treats specially (negations, boosters, "but", "least",
+idioms, mixed ALL CAPS emphasis) fall back to ``polarity_scores`` per
+text, so labels always match the per-text path.
+
+    python bulk.py ../../database/data/reviews.json
+"""
+
+import json
+import string
+import sys
+
+import numpy as np
+
+from lexicon import build_analyzer, label
+
+PUNC_LIST = [
+    ".", "!", "?", ",", ";", ":", "-", "'", '"',
+    "!!", "!!!", "??", "???", "?!?", "!?!", "?!?!", "!?!?",
+]
+_PUNC_CHARS = frozenset("".join(PUNC_LIST))
+_STRIP_PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+
+def tokenize(text):
+    """VADER's ``SentiText.words_and_emoticons`` without its product()."""
+    words_only = {
+        w for w in text.translate(_STRIP_PUNCTUATION).split() if len(w) > 1
+    }
+    tokens = []
+    for token in text.split():
+        if len(token) <= 1:
+            continue
+        # SentiText maps "word<p>" and "<p>word" back to "word" for the
+        # punctuation-free words of the text
+        stripped = False
+        if token[-1] in _PUNC_CHARS:
+            for p in PUNC_LIST:
+                if token.endswith(p) and token[:-len(p)] in words_only:
+                    token = token[:-len(p)]
+                    stripped = True
+                    break
+        if not stripped and token[0] in _PUNC_CHARS:
+            for p in PUNC_LIST:
+                if token.startswith(p) and token[len(p):] in words_only:
+                    token = token[len(p):]
+                    break
+        tokens.append(token)
+    return tokens
+
+
+class BulkScorer:
+    """Labels corpora in bulk; build once and reuse across batches."""
+
+    def __init__(self, analyzer=None):
+        self.analyzer = analyzer or build_analyzer()
+        self.lexicon = self.analyzer.lexicon
+        constants = self.analyzer.constants
+        # Single words that change a neighbour's valence or are zeroed
+        self.context_words = (
+            set(constants.NEGATE)
+            | {w for w in constants.BOOSTER_DICT if " " not in w}
+            | {"least", "but", "never", "so", "this"}
+        )
+        # Multi-word boosters and idioms, matched on token boundaries
+        self.context_phrases = [
+            f" {phrase} "
+            for phrase in list(constants.BOOSTER_DICT)
+            + list(constants.SPECIAL_CASE_IDIOMS)
+            if " " in phrase
+        ]
+        self.vocab = {}
+        self.valences = []
+        self.fast_path_texts = 0
+        self.fallback_texts = 0
+
+    def _needs_context(self, tokens, lowered):
+        if self.context_words.intersection(lowered):
+            return True
+        if any("n't" in w for w in lowered):
+            return True
+        joined = " " + " ".join(lowered) + " "
+        if any(phrase in joined for phrase in self.context_phrases):
+            return True
+        # ALL CAPS emphasis only applies when some, not all, words are caps
+        caps = [t.isupper() for t in tokens]
+        if any(caps) and not all(caps):
+            return any(
+                c and w in self.lexicon for c, w in zip(caps, lowered)
+            )
+        return False
+
+    def _token_id(self, word):
+        token_id = self.vocab.get(word)
+        if token_id is None:
+            token_id = len(self.valences)
+            self.vocab[word] = token_id
+            self.valences.append(self.lexicon.get(word, 0.0))
+        return token_id
+
+    def label_texts(self, texts):
+        """Return one label per text, in input order."""
+        labels = [None] * len(texts)
+        fast_rows = []
+        token_ids = []
+        row_of_token = []
+        amplifiers = []
+
+        for i, text in enumerate(texts):
+            if not isinstance(text, str):
+                text = str(text.encode("utf-8"))
+            tokens = tokenize(text)
+            lowered = [t.lower() for t in tokens]
+            if self._needs_context(tokens, lowered):
+                self.fallback_texts += 1
+                scores = self.analyzer.polarity_scores(text)
+                labels[i] = label(scores["pos"], scores["neg"], scores["neu"])
+                continue
+            self.fast_path_texts += 1
+            row = len(fast_rows)
+            fast_rows.append(i)
+            token_ids.extend(map(self._token_id, lowered))
+            row_of_token.extend([row] * len(lowered))
+            amplifiers.append(_punctuation_amplifier(text))
+
+        if fast_rows:
+            fast_labels = self._label_vectorized(
+                np.asarray(token_ids, dtype=np.int64),
+                np.asarray(row_of_token, dtype=np.int64),
+                np.asarray(amplifiers, dtype=np.float64),
+            )
+            for i, value in zip(fast_rows, fast_labels):
+                labels[i] = value
+        return labels
+
+    def _label_vectorized(self, token_ids, rows, amplifiers):
+        n = len(amplifiers)
+        val = np.asarray(self.valences, dtype=np.float64)[token_ids]
+        # bincount accumulates in input order, so the sums are bitwise
+        # equal to VADER's sequential loop
+        pos_sum = np.bincount(rows, np.where(val > 0, val + 1, 0), n)
+        neg_sum = np.bincount(rows, np.where(val < 0, val - 1, 0), n)
+        neu_count = np.bincount(rows, (val == 0).astype(np.float64), n)
+
+        more_pos = pos_sum > np.abs(neg_sum)
+        more_neg = pos_sum < np.abs(neg_sum)
+        pos_sum = np.where(more_pos, pos_sum + amplifiers, pos_sum)
+        neg_sum = np.where(more_neg, neg_sum - amplifiers, neg_sum)
+        total = pos_sum + np.abs(neg_sum) + neu_count
+        empty = total == 0
+        safe_total = np.where(empty, 1.0, total)
+        pos = np.abs(pos_sum / safe_total)
+        neg = np.abs(neg_sum / safe_total)
+        neu = np.abs(neu_count / safe_total)
+
+        r_pos, r_neg, r_neu = (np.round(a, 3) for a in (pos, neg, neu))
+        result = np.full(n, "positive", dtype=object)
+        result[(r_neg > r_pos) & (r_neg > r_neu)] = "negative"
+        result[(r_neu > r_neg) & (r_neu > r_pos)] = "neutral"
+
+        # np.round can differ from round() by one ulp-driven step; redo the
+        # rows where that could flip a comparison with Python's round()
+        close = (
+            (np.abs(r_pos - r_neg) < 2e-3)
+            | (np.abs(r_pos - r_neu) < 2e-3)
+            | (np.abs(r_neg - r_neu) < 2e-3)
+        ) & ~empty
+        for row in np.flatnonzero(close):
+            result[row] = label(
+                round(float(pos[row]), 3),
+                round(float(neg[row]), 3),
+                round(float(neu[row]), 3),
+            )
+        return list(result)
+
+
+def _punctuation_amplifier(text):
+    # VADER's _amplify_ep + _amplify_qm
+    amplifier = min(text.count("!"), 4) * 0.292
+    qm_count = text.count("?")
+    if qm_count > 1:
+        amplifier += qm_count * 0.18 if qm_count <= 3 else 0.96
+    return amplifier
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], encoding="utf-8") as fh:
+        data = json.load(fh)
+    if isinstance(data, dict):
+        data = [r.get("review", "") for r in data["reviews"]]
+    print(json.dumps(BulkScorer().label_texts(data)))
@@ -0,0 +1,47 @@
+"""Production serving mode for the sentiment analyzer.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+VADER scoring is CPU-bound and holds the GIL, so throughput comes from
+processes: a prefork pool of sync workers, one per core by default. The
+master imports the app and loads the lexicon once before forking, so
+workers share those pages copy-on-write instead of each loading its own.
+
+Environment:
+    SENTIMENT_BIND      address to listen on (default 0.0.0.0:5000)
+    SENTIMENT_WORKERS   worker processes (default: available cores)
+    SENTIMENT_TIMEOUT   seconds before a stuck worker is restarted
+    SENTIMENT_BACKLOG   pending-connection queue length
+"""
+
+import gc
+import os
+
+# The master loads the lexicon synchronously in when_ready(); a warm-up
+# thread must not be running when workers are forked.
+os.environ["SENTIMENT_PREWARM"] = "0"
+
+
+def _cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv("SENTIMENT_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("SENTIMENT_WORKERS", _cores()))
+worker_class = "sync"
+timeout = int(os.getenv("SENTIMENT_TIMEOUT", "30"))
+backlog = int(os.getenv("SENTIMENT_BACKLOG", "2048"))
+preload_app = True
+
+
+def when_ready(server):
+    import app
+
+    app.get_analyzer()
+    # Move everything loaded so far out of the collector's reach so
+    # collections in the workers do not write to (and copy) shared pages
+    gc.freeze()
+    server.log.info("Lexicon preloaded; forking %s workers", workers)
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangoapp", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SentimentResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "text_hash",
+                    models.CharField(max_length=64, unique=True),
+                ),
+                ("lexicon_version", models.CharField(max_length=32)),
+                ("sentiment", models.CharField(max_length=10)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
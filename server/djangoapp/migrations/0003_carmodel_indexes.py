@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangoapp", "0002_sentimentresult"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="carmodel",
+            index=models.Index(
+                fields=["car_make", "type", "year", "id"],
+                name="carmodel_make_type_year_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carmodel",
+            index=models.Index(
+                fields=["type", "year", "id"],
+                name="carmodel_type_year_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carmodel",
+            index=models.Index(
+                fields=["dealer_id", "year", "id"],
+                name="carmodel_dealer_year_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carmodel",
+            index=models.Index(
+                fields=["year", "id"], name="carmodel_year_idx"
+            ),
+        ),
+    ]
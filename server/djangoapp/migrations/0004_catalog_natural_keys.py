@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+
+def dedupe_catalog(apps, schema_editor):
+    # Concurrent first-time seeding could insert the catalog twice;
+    # keep the oldest row per natural key before adding the constraints.
+    CarMake = apps.get_model("djangoapp", "CarMake")
+    CarModel = apps.get_model("djangoapp", "CarModel")
+
+    keep = {}
+    for make in CarMake.objects.order_by("id"):
+        if make.name in keep:
+            CarModel.objects.filter(car_make=make).update(
+                car_make=keep[make.name]
+            )
+            make.delete()
+        else:
+            keep[make.name] = make
+
+    seen = set()
+    for car in CarModel.objects.order_by("id"):
+        key = (car.car_make_id, car.name, car.year, car.dealer_id)
+        if key in seen:
+            car.delete()
+        else:
+            seen.add(key)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangoapp", "0003_carmodel_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_catalog, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="carmake",
+            constraint=models.UniqueConstraint(
+                fields=["name"], name="carmake_name_unique"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="carmodel",
+            constraint=models.UniqueConstraint(
+                fields=["car_make", "name", "year", "dealer_id"],
+                name="carmodel_natural_key",
+            ),
+        ),
+    ]
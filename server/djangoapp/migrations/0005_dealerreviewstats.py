@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangoapp", "0004_catalog_natural_keys"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DealerReviewStats",
+            fields=[
+                (
+                    "dealer_id",
+                    models.IntegerField(primary_key=True, serialize=False),
+                ),
+                ("review_count", models.IntegerField(default=0)),
+                ("positive", models.IntegerField(default=0)),
+                ("neutral", models.IntegerField(default=0)),
+                ("negative", models.IntegerField(default=0)),
+                ("purchased", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -14,6 +14,14 @@ class CarMake(models.Model):
     country = models.CharField(max_length=100, blank=True, null=True)
     founded_year = models.IntegerField(blank=True, null=True)
 
+    class Meta:
+        # Natural key used by loader.load_cars upserts
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name"], name="carmake_name_unique"
+            ),
+        ]
+
     def __str__(self):
         return self.name  # Display car make name
 
@@ -44,5 +52,58 @@ class CarModel(models.Model):
     # Optional: Dealer ID to link to external dealer database
     dealer_id = models.IntegerField(default=0)
 
+    class Meta:
+        # Composite indexes for the filters and keyset ordering used by
+        # catalog.search (the trailing id makes keyset seeks index-only)
+        indexes = [
+            models.Index(
+                fields=["car_make", "type", "year", "id"],
+                name="carmodel_make_type_year_idx",
+            ),
+            models.Index(
+                fields=["type", "year", "id"],
+                name="carmodel_type_year_idx",
+            ),
+            models.Index(
+                fields=["dealer_id", "year", "id"],
+                name="carmodel_dealer_year_idx",
+            ),
+            models.Index(fields=["year", "id"], name="carmodel_year_idx"),
+        ]
+        # Natural key used by loader.load_cars upserts
+        constraints = [
+            models.UniqueConstraint(
+                fields=["car_make", "name", "year", "dealer_id"],
+                name="carmodel_natural_key",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.car_make.name} - {self.name}"  # Show make and model
+
+
+# Persistent tier of the sentiment cache (see sentiment_cache.py)
+class SentimentResult(models.Model):
+    # sha256 of the normalized review text plus the lexicon version
+    text_hash = models.CharField(max_length=64, unique=True)
+    lexicon_version = models.CharField(max_length=32)
+    sentiment = models.CharField(max_length=10)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.text_hash[:12]} ({self.sentiment})"
+
+
+# Per-dealer review aggregates (see review_stats.py)
+class DealerReviewStats(models.Model):
+    dealer_id = models.IntegerField(primary_key=True)
+    review_count = models.IntegerField(default=0)
+    positive = models.IntegerField(default=0)
+    neutral = models.IntegerField(default=0)
+    negative = models.IntegerField(default=0)
+    # Reviews whose author bought the car from this dealer
+    purchased = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"dealer {self.dealer_id} ({self.review_count} reviews)"
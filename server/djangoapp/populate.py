@@ -1,4 +1,4 @@
-from .models import CarMake, CarModel
+from .loader import load_cars, load_makes
 
 
 def initiate():
@@ -10,12 +10,7 @@ def initiate():
         {"name": "Toyota", "description": "Great cars. Japanese technology"},
     ]
 
-    car_make_instances = []
-    for data in car_make_data:
-        make = CarMake.objects.create(
-            name=data["name"], description=data["description"]
-        )
-        car_make_instances.append(make)
+    load_makes(car_make_data)
 
     # Create CarModel instances
     car_model_data = [
@@ -23,99 +18,100 @@ def initiate():
             "name": "Pathfinder",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[0],
+            "car_make": car_make_data[0]["name"],
         },
         {
             "name": "Qashqai",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[0],
+            "car_make": car_make_data[0]["name"],
         },
         {
             "name": "XTRAIL",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[0],
+            "car_make": car_make_data[0]["name"],
         },
         {
             "name": "A-Class",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[1],
+            "car_make": car_make_data[1]["name"],
         },
         {
             "name": "C-Class",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[1],
+            "car_make": car_make_data[1]["name"],
         },
         {
             "name": "E-Class",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[1],
+            "car_make": car_make_data[1]["name"],
         },
         {
             "name": "A4",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[2],
+            "car_make": car_make_data[2]["name"],
         },
         {
             "name": "A5",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[2],
+            "car_make": car_make_data[2]["name"],
         },
         {
             "name": "A6",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[2],
+            "car_make": car_make_data[2]["name"],
         },
         {
             "name": "Sorrento",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[3],
+            "car_make": car_make_data[3]["name"],
         },
         {
             "name": "Carnival",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[3],
+            "car_make": car_make_data[3]["name"],
         },
         {
             "name": "Cerato",
             "type": "Sedan",
             "year": 2023,
-            "car_make": car_make_instances[3],
+            "car_make": car_make_data[3]["name"],
         },
         {
             "name": "Corolla",
             "type": "Sedan",
             "year": 2023,
-            "car_make": car_make_instances[4],
+            "car_make": car_make_data[4]["name"],
         },
         {
             "name": "Camry",
             "type": "Sedan",
             "year": 2023,
-            "car_make": car_make_instances[4],
+            "car_make": car_make_data[4]["name"],
         },
         {
             "name": "Kluger",
             "type": "SUV",
             "year": 2023,
-            "car_make": car_make_instances[4],
+            "car_make": car_make_data[4]["name"],
         },
     ]
 
-    for data in car_model_data:
-        CarModel.objects.create(
-            name=data["name"],
-            car_make=data["car_make"],
-            type=data["type"],
-            year=data["year"],
-        )
-     
\ No newline at end of file
+    load_cars(
+        {
+            "make": data["car_make"],
+            "model": data["name"],
+            "bodyType": data["type"],
+            "year": data["year"],
+        }
+        for data in car_model_data
+    )
@@ -0,0 +1,84 @@
+"""JSON responses with a pluggable encoder, and upstream pass-through.
+
+``FastJsonResponse`` takes the place of ``JsonResponse`` in the views.
+It encodes with orjson when that is installed, and otherwise with the
+stdlib encoder in compact form (no spaces after separators).
+``settings.JSON_SERIALIZER`` chooses: "auto" (the default), "orjson" or
+"stdlib". Types neither encoder knows (Decimal, UUID, lazy strings...)
+go through ``DjangoJSONEncoder`` as before.
+
+``RawJsonResponse`` sends bytes that are already JSON, such as a body
+relayed from the Express backend, and ``envelope`` wraps such bytes in a
+small object without decoding them.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+_encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+
+def stdlib_dumps(data):
+    return _encoder.encode(data).encode()
+
+
+def orjson_dumps(data):
+    return orjson.dumps(
+        data,
+        default=_encoder.default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+def serializer(name):
+    """Return the ``dumps`` (object -> bytes) for a JSON_SERIALIZER."""
+    if name not in ("auto", "orjson", "stdlib"):
+        raise ImproperlyConfigured(
+            f"Unknown JSON_SERIALIZER {name!r}; use auto, orjson or stdlib"
+        )
+    if name == "stdlib" or (name == "auto" and orjson is None):
+        return stdlib_dumps
+    if orjson is None:
+        raise ImproperlyConfigured(
+            "JSON_SERIALIZER is orjson but orjson is not installed"
+        )
+    return orjson_dumps
+
+
+dumps = serializer(settings.JSON_SERIALIZER)
+
+
+class FastJsonResponse(HttpResponse):
+    """``JsonResponse`` encoded with ``dumps``."""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set "
+                "the safe parameter to False."
+            )
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
+
+
+class RawJsonResponse(HttpResponse):
+    """A response whose ``content`` is already-encoded JSON bytes."""
+
+    def __init__(self, content, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=content, **kwargs)
+
+
+def envelope(fields, key, raw):
+    """JSON bytes of ``{**fields, key: raw}``; ``raw`` is not decoded."""
+    head = dumps(fields)[:-1]
+    if fields:
+        head += b","
+    return head + dumps(key) + b":" + raw + b"}"
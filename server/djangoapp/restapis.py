@@ -1,49 +1,410 @@
+import contextvars
+import logging
 import requests
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from .metrics import Counter, Gauge, request_elapsed, upstream_call
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 backend_url = os.getenv("backend_url", default="http://localhost:3030")
 sentiment_analyzer_url = os.getenv(
     "sentiment_analyzer_url", default="http://localhost:5050/"
 )
+# Texts sent per /analyze_batch request (the analyzer caps it at 1000)
+sentiment_batch_size = int(os.getenv("sentiment_batch_size", default="100"))
+# Per-call timeout in seconds for every backend/analyzer request
+http_timeout = float(os.getenv("http_timeout", default="5"))
+# Keep-alive connections kept open per upstream host
+http_pool_size = int(os.getenv("http_pool_size", default="20"))
+# Upper bound on outbound calls in flight across all requests
+http_max_concurrency = int(os.getenv("http_max_concurrency", default="32"))
+# Seconds a request may spend in total on outbound calls; later calls get
+# the remainder as their timeout and are skipped once it is spent
+http_request_budget = float(os.getenv("http_request_budget", default="8"))
+# Circuit breakers: open when at least breaker_min_calls of the last
+# breaker_window calls were made and breaker_failure_rate of them failed;
+# try one call again after breaker_reset_timeout seconds
+breaker_failure_rate = float(os.getenv("breaker_failure_rate", default="0.5"))
+breaker_min_calls = int(os.getenv("breaker_min_calls", default="5"))
+breaker_window = int(os.getenv("breaker_window", default="20"))
+breaker_reset_timeout = float(
+    os.getenv("breaker_reset_timeout", default="30")
+)
+
+session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=http_pool_size, pool_maxsize=http_pool_size
+)
+session.mount("http://", _adapter)
+session.mount("https://", _adapter)
+
+_executor = ThreadPoolExecutor(
+    max_workers=http_max_concurrency, thread_name_prefix="restapis"
+)
+
+BREAKER_STATE = Gauge(
+    "upstream_circuit_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open.",
+    ("upstream",),
+)
+BREAKER_TRANSITIONS = Counter(
+    "upstream_circuit_transitions_total",
+    "Circuit breaker state changes, by new state.",
+    ("upstream", "state"),
+)
+SKIPPED_CALLS = Counter(
+    "upstream_skipped_calls_total",
+    "Outbound calls not made: circuit open or request budget spent.",
+    ("upstream", "reason"),
+)
+
+
+def _is_failure(exc):
+    # 4xx answers (a dealer that does not exist, an analyzer without
+    # /analyze_batch) mean the upstream is healthy
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(exc, "status", None)  # aiohttp
+    return status is None or status >= 500
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over an upstream's recent calls.
+
+    Ask ``allow()`` before a call and wrap the call in ``with breaker:``
+    to record its outcome. Shared by ``restapis`` and ``async_restapis``.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name, failure_rate=None, min_calls=None,
+                 window=None, reset_timeout=None):
+        self.name = name
+        self.failure_rate = failure_rate or breaker_failure_rate
+        self.min_calls = min_calls or breaker_min_calls
+        self.reset_timeout = reset_timeout or breaker_reset_timeout
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window or breaker_window)
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        BREAKER_STATE.set(0, name)
+
+    def _set_state(self, state):
+        self.state = state
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        BREAKER_STATE.set(self._STATE_VALUES[state], self.name)
+        BREAKER_TRANSITIONS.inc(self.name, state)
+        logger.warning(
+            "circuit breaker state changed",
+            extra={"upstream": self.name, "state": state},
+        )
+
+    def is_open(self):
+        """True while calls are rejected outright (no trial is due yet)."""
+        with self._lock:
+            return (
+                self.state == self.OPEN
+                and time.monotonic() - self._opened_at < self.reset_timeout
+            )
+
+    def allow(self):
+        """Whether a call may go out now; half-open admits one trial."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+            return True
+
+    def record(self, ok):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_running = False
+                self._set_state(self.CLOSED if ok else self.OPEN)
+            elif self.state == self.CLOSED:
+                self._outcomes.append(ok)
+                failures = self._outcomes.count(False)
+                if (
+                    len(self._outcomes) >= self.min_calls
+                    and failures >= self.failure_rate * len(self._outcomes)
+                ):
+                    self._set_state(self.OPEN)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record(exc is None or not _is_failure(exc))
+        return False
+
+
+breakers = {
+    "backend": CircuitBreaker("backend"),
+    "sentiment_analyzer": CircuitBreaker("sentiment_analyzer"),
+}
+
+
+def remaining_budget():
+    """Seconds left of the current request's ``http_request_budget``.
+
+    ``None`` outside a request (management commands, background
+    refreshes), where only ``http_timeout`` applies.
+    """
+    elapsed = request_elapsed()
+    if elapsed is None:
+        return None
+    return http_request_budget - elapsed
+
+
+def call_timeout():
+    """Timeout for the next outbound call, or None once the budget is spent."""
+    remaining = remaining_budget()
+    if remaining is None:
+        return http_timeout
+    if remaining <= 0:
+        return None
+    return min(http_timeout, remaining)
+
+
+def admit(upstream):
+    """Return the timeout for a call to ``upstream``, or None to skip it.
+
+    Calls are skipped while the upstream's breaker is open or once the
+    request budget is spent, so callers fall back immediately.
+    """
+    timeout = call_timeout()
+    if timeout is None:
+        SKIPPED_CALLS.inc(upstream, "budget")
+        return None
+    if not breakers[upstream].allow():
+        SKIPPED_CALLS.inc(upstream, "open")
+        return None
+    return timeout
+
+
+def available(upstream):
+    """False while ``upstream``'s breaker is open or the budget is spent."""
+    return call_timeout() is not None and not breakers[upstream].is_open()
+
+
+def gather(calls, deadline=None):
+    """Run ``(func, *args)`` tuples concurrently on the shared pool.
+
+    Returns results in input order. Calls still running after
+    ``deadline`` seconds, or that raised, yield ``None``.
+    """
+    # Each call runs in a copy of the caller's context so its timings
+    # are added to the current request's metrics
+    futures = [
+        _executor.submit(contextvars.copy_context().run, *call)
+        for call in calls
+    ]
+    remaining = remaining_budget()
+    if remaining is not None:
+        remaining = max(remaining, 0)
+        deadline = remaining if deadline is None else min(deadline, remaining)
+    done, not_done = wait(futures, timeout=deadline)
+    for future in not_done:
+        future.cancel()
+    if not_done:
+        logger.warning(
+            "calls missed the deadline",
+            extra={"missed": len(not_done), "calls": len(futures)},
+        )
+
+    results = []
+    for future in futures:
+        if future in done and future.exception() is None:
+            results.append(future.result())
+        else:
+            results.append(None)
+    return results
 
 
 def get_request(endpoint, **kwargs):
     request_url = backend_url + endpoint
-    print(f"GET from {request_url} with params {kwargs}")
+    logger.info("backend GET", extra={"url": request_url, "params": kwargs})
 
+    timeout = admit("backend")
+    if timeout is None:
+        return None
     try:
-        response = requests.get(request_url, params=kwargs, timeout=5)
-        response.raise_for_status()
+        with breakers["backend"], upstream_call("backend"):
+            response = session.get(
+                request_url, params=kwargs, timeout=timeout
+            )
+            response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
-        print(f"Network exception occurred: {e}")
+        logger.warning(
+            "backend request failed",
+            extra={"url": request_url, "error": str(e)},
+        )
+        return None
+
+
+def get_raw(endpoint, **kwargs):
+    """``get_request`` returning the body bytes, without decoding them."""
+    request_url = backend_url + endpoint
+    timeout = admit("backend")
+    if timeout is None:
+        return None
+    try:
+        with breakers["backend"], upstream_call("backend"):
+            response = session.get(
+                request_url, params=kwargs, timeout=timeout
+            )
+            response.raise_for_status()
+        return response.content
+    except requests.exceptions.RequestException as e:
+        logger.warning(
+            "backend request failed",
+            extra={"url": request_url, "error": str(e)},
+        )
         return None
 
 
 def analyze_review_sentiments(text):
     request_url = sentiment_analyzer_url + "analyze/" + text
+    timeout = admit("sentiment_analyzer")
+    if timeout is None:
+        return None
     try:
-        response = requests.get(request_url, timeout=5)
-        response.raise_for_status()
+        with breakers["sentiment_analyzer"], upstream_call(
+            "sentiment_analyzer"
+        ):
+            response = session.get(request_url, timeout=timeout)
+            response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
-        print(f"Sentiment analyzer network exception occurred: {e}")
+        logger.warning(
+            "sentiment analyzer request failed", extra={"error": str(e)}
+        )
         return None
     except Exception as err:
-        print(f"Unexpected error: {err}")
+        logger.exception(
+            "unexpected sentiment analyzer error", extra={"error": str(err)}
+        )
         return None
 
 
-def post_review(data_dict):
-    request_url = backend_url + "/insert_review"
+def _analyze_chunk(request_url, chunk):
+    timeout = admit("sentiment_analyzer")
+    if timeout is None:
+        return None
     try:
-        response = requests.post(request_url, json=data_dict, timeout=5)
-        response.raise_for_status()
-        print(f"Posted review response: {response.json()}")
-        return response.json()
+        with breakers["sentiment_analyzer"], upstream_call(
+            "sentiment_analyzer"
+        ):
+            response = session.post(
+                request_url, json={"texts": chunk}, timeout=timeout
+            )
+            response.raise_for_status()
+        labels = response.json()["sentiments"]
+    except requests.exceptions.RequestException as e:
+        logger.warning(
+            "sentiment analyzer request failed", extra={"error": str(e)}
+        )
+        return None
+    except (KeyError, ValueError) as err:
+        logger.warning(
+            "unexpected batch response", extra={"error": str(err)}
+        )
+        return None
+    if len(labels) != len(chunk):
+        logger.warning(
+            "batch response size does not match request size",
+            extra={"sent": len(chunk), "received": len(labels)},
+        )
+        return None
+    return labels
+
+
+def analyze_review_sentiments_batch(texts):
+    """Label every text in ``texts`` via the analyzer's batch endpoint.
+
+    Chunks are sent concurrently. Returns a list of sentiment labels in
+    input order, or ``None`` if any chunk could not be scored.
+    """
+    request_url = sentiment_analyzer_url + "analyze_batch"
+    chunks = [
+        texts[start:start + sentiment_batch_size]
+        for start in range(0, len(texts), sentiment_batch_size)
+    ]
+    if len(chunks) == 1:
+        results = [_analyze_chunk(request_url, chunks[0])]
+    else:
+        results = gather(
+            [(_analyze_chunk, request_url, chunk) for chunk in chunks],
+            deadline=http_timeout,
+        )
+    sentiments = []
+    for labels in results:
+        if labels is None:
+            return None
+        sentiments.extend(labels)
+    return sentiments
+
+
+class ReviewsRejected(Exception):
+    """The backend refused a review batch; sending it again won't help."""
+
+    def __init__(self, status):
+        super().__init__(f"backend rejected the reviews ({status})")
+        self.status = status
+
+
+def post_reviews(reviews):
+    """Store a batch of reviews with one call to ``/insert_reviews``.
+
+    Returns the backend's answer, or ``None`` when the call failed and
+    may succeed later. Raises ``ReviewsRejected`` on a 4xx answer (other
+    than 408/429), which a retry will not change.
+    """
+    request_url = backend_url + "/insert_reviews"
+    timeout = admit("backend")
+    if timeout is None:
+        return None
+    try:
+        with breakers["backend"], upstream_call("backend"):
+            response = session.post(
+                request_url, json={"reviews": reviews}, timeout=timeout
+            )
+            response.raise_for_status()
+        result = response.json()
+        logger.info(
+            "reviews posted",
+            extra={"count": len(reviews), "inserted": result.get("inserted")},
+        )
+        return result
     except requests.exceptions.RequestException as e:
-        print(f"Network exception occurred during post: {e}")
+        status = getattr(e.response, "status_code", None)
+        if not _is_failure(e) and status not in (408, 429):
+            logger.warning(
+                "review batch rejected",
+                extra={"url": request_url, "status": status},
+            )
+            raise ReviewsRejected(status) from e
+        logger.warning(
+            "review batch post failed",
+            extra={"url": request_url, "error": str(e)},
+        )
         return None
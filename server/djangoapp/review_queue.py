@@ -0,0 +1,355 @@
+"""Durable, batched review submission.
+
+``enqueue`` validates a review, appends it to a local SQLite spool
+(``settings.REVIEW_SPOOL_PATH``) and returns at once, so ``add_review``
+can answer 202 without waiting for the backend. A flusher thread in each
+process drains the spool: it claims up to ``REVIEW_BATCH_SIZE`` rows
+with a lease, labels their sentiment in one batch and posts them to the
+backend's ``/insert_reviews``. Rows are deleted only once the backend
+accepts them, after the stored reviews are added to the per-dealer
+aggregates (``review_stats``); a failed batch is retried after a backoff.
+
+A batch the backend rejects (4xx) is sent again one review at a time so
+the others go through. A review still rejected after
+``REVIEW_MAX_ATTEMPTS`` sends moves to the spool's ``dead_letter``
+table and is logged, so it cannot hold up the rest of the spool.
+
+Reviews sent without a label (analyzer unavailable) are kept in the
+``unscored`` table and added to the aggregates by a later flush, once
+the analyzer labels them.
+
+Each review carries a ``submission_id`` that the backend uses to drop
+duplicates, so a batch that was stored but not acknowledged can be sent
+again safely. Reviews left in the spool by a stopped process are sent
+by the next flusher that runs (or by ``manage.py flush_reviews``).
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import review_stats
+from .metrics import Counter
+from .restapis import ReviewsRejected, http_timeout, post_reviews
+from .sentiment_cache import get_sentiments
+
+logger = logging.getLogger(__name__)
+
+# Field -> type of every review field the backend requires
+REVIEW_FIELDS = {
+    "name": str,
+    "dealership": int,
+    "review": str,
+    "purchase": bool,
+    "purchase_date": str,
+    "car_make": str,
+    "car_model": str,
+    "car_year": int,
+}
+MAX_REVIEW_LENGTH = 5000
+# A claimed batch not deleted within this many seconds is sent again
+CLAIM_LEASE = 4 * http_timeout
+MAX_BACKOFF = 60
+
+REVIEWS_QUEUED = Counter(
+    "reviews_queued_total", "Reviews accepted into the spool."
+)
+REVIEWS_SENT = Counter(
+    "reviews_sent_total", "Reviews the backend acknowledged."
+)
+FAILED_BATCHES = Counter(
+    "review_batches_failed_total", "Review batches the backend rejected."
+)
+DEAD_LETTERED = Counter(
+    "reviews_dead_lettered_total",
+    "Reviews the backend kept rejecting, moved out of the spool.",
+)
+
+_local = threading.local()
+_wake = threading.Event()
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            settings.REVIEW_SPOOL_PATH, timeout=20, isolation_level=None
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS spool ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " submission_id TEXT NOT NULL UNIQUE,"
+            " payload TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " claimed_until REAL NOT NULL DEFAULT 0)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letter ("
+            " id INTEGER PRIMARY KEY,"
+            " submission_id TEXT NOT NULL UNIQUE,"
+            " payload TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL,"
+            " status INTEGER,"
+            " failed_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS unscored ("
+            " submission_id TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL)"
+        )
+        _local.conn = conn
+    return conn
+
+
+def validate(data):
+    """Return the review fields of ``data``, coerced; raise ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError("review must be a JSON object")
+    review = {}
+    for field, kind in REVIEW_FIELDS.items():
+        value = data.get(field)
+        if value is None or value == "":
+            raise ValueError(f"{field} is required")
+        if kind is int:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} must be an integer")
+        elif kind is bool:
+            if not isinstance(value, bool):
+                value = str(value).lower() in ("true", "1", "yes")
+        else:
+            value = str(value)
+        review[field] = value
+    if len(review["review"]) > MAX_REVIEW_LENGTH:
+        raise ValueError(
+            f"review must be at most {MAX_REVIEW_LENGTH} characters"
+        )
+    return review
+
+
+def enqueue(data):
+    """Validate ``data`` and spool it; return its submission id."""
+    review = validate(data)
+    review["submission_id"] = uuid.uuid4().hex
+    conn = _connection()
+    row_id = conn.execute(
+        "INSERT INTO spool (submission_id, payload) VALUES (?, ?)",
+        (review["submission_id"], json.dumps(review)),
+    ).lastrowid
+    REVIEWS_QUEUED.inc()
+    start_flusher()
+    # Row ids grow by one per submission across every worker, so each
+    # REVIEW_BATCH_SIZE-th one sends a batch early without counting rows
+    if row_id % settings.REVIEW_BATCH_SIZE == 0:
+        _wake.set()
+    return review["submission_id"]
+
+
+def pending():
+    """Number of spooled reviews not yet acknowledged by the backend."""
+    return _connection().execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+
+def dead_lettered():
+    """Number of reviews moved to ``dead_letter`` after rejections."""
+    return _connection().execute(
+        "SELECT COUNT(*) FROM dead_letter"
+    ).fetchone()[0]
+
+
+def _outgoing(payload):
+    # Only the review fields go to the backend. A client-supplied
+    # "sentiment" is never among them: reads trust stored labels, so the
+    # only label sent is the one scored here.
+    return {
+        field: payload[field]
+        for field in (*REVIEW_FIELDS, "submission_id")
+        if field in payload
+    }
+
+
+def flush_once(limit=None):
+    """Send one batch; return how many were sent, or None on failure."""
+    conn = _connection()
+    now = time.time()
+    # One UPDATE claims the batch, so concurrent flushers (one per
+    # worker process) never take the same rows
+    rows = conn.execute(
+        "UPDATE spool SET claimed_until = ?, attempts = attempts + 1"
+        " WHERE id IN (SELECT id FROM spool WHERE claimed_until < ?"
+        " ORDER BY id LIMIT ?)"
+        " RETURNING id, payload, attempts",
+        (now + CLAIM_LEASE, now, limit or settings.REVIEW_BATCH_SIZE),
+    ).fetchall()
+    if not rows:
+        return 0
+    rows.sort()
+    return _send(conn, rows)
+
+
+def _back_off(conn, rows):
+    attempts = max(row[2] for row in rows)
+    retry_at = time.time() + min(MAX_BACKOFF, 2 ** attempts)
+    placeholders = ",".join("?" * len(rows))
+    conn.execute(
+        f"UPDATE spool SET claimed_until = ? WHERE id IN ({placeholders})",
+        (retry_at, *(row[0] for row in rows)),
+    )
+
+
+def _dead_letter(conn, row, review, status):
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(
+        "INSERT OR REPLACE INTO dead_letter"
+        " SELECT id, submission_id, payload, attempts, ?, ? FROM spool"
+        " WHERE id = ?",
+        (status, time.time(), row[0]),
+    )
+    conn.execute("DELETE FROM spool WHERE id = ?", (row[0],))
+    conn.execute("COMMIT")
+    DEAD_LETTERED.inc()
+    logger.error(
+        "review dead-lettered",
+        extra={
+            "submission_id": review["submission_id"],
+            "dealership": review["dealership"],
+            "status": status,
+            "attempts": row[2],
+        },
+    )
+
+
+def _send(conn, rows):
+    """Post claimed ``rows``; return how many were sent, None if none."""
+    ids = [row[0] for row in rows]
+    reviews = [_outgoing(json.loads(row[1])) for row in rows]
+
+    labels = get_sentiments([r["review"] for r in reviews], default=None)
+    for review, label in zip(reviews, labels):
+        if label:
+            review["sentiment"] = label
+
+    try:
+        result = post_reviews(reviews)
+    except ReviewsRejected as rejected:
+        FAILED_BATCHES.inc()
+        if len(rows) > 1:
+            # Find the rejected reviews; the rest of the batch still goes
+            sent = sum(_send(conn, [row]) or 0 for row in rows)
+            return sent or None
+        if rows[0][2] >= settings.REVIEW_MAX_ATTEMPTS:
+            _dead_letter(conn, rows[0], reviews[0], rejected.status)
+        else:
+            _back_off(conn, rows)
+        return None
+    if result is None:
+        FAILED_BATCHES.inc()
+        _back_off(conn, rows)
+        return None
+    # Reviews the backend already had are retries of an earlier flush
+    # and were counted then
+    duplicates = set(result.get("duplicates") or ())
+    stored = [r for r in reviews if r["submission_id"] not in duplicates]
+    _record([r for r in stored if r.get("sentiment")])
+    conn.executemany(
+        "INSERT OR IGNORE INTO unscored (submission_id, payload)"
+        " VALUES (?, ?)",
+        [
+            (r["submission_id"], json.dumps(r))
+            for r in stored if not r.get("sentiment")
+        ],
+    )
+    placeholders = ",".join("?" * len(ids))
+    conn.execute(f"DELETE FROM spool WHERE id IN ({placeholders})", ids)
+    REVIEWS_SENT.inc(amount=len(ids))
+    return len(ids)
+
+
+def _record(reviews):
+    try:
+        review_stats.record(reviews)
+    except Exception:  # noqa: BLE001
+        logger.exception("review aggregates not updated")
+
+
+def backfill_labels(limit=None):
+    """Label stored reviews sent unscored and add them to the aggregates.
+
+    Returns how many were recorded.
+    """
+    conn = _connection()
+    rows = conn.execute(
+        "SELECT submission_id, payload FROM unscored LIMIT ?",
+        (limit or settings.REVIEW_BATCH_SIZE,),
+    ).fetchall()
+    if not rows:
+        return 0
+    reviews = [json.loads(row[1]) for row in rows]
+    labels = get_sentiments([r["review"] for r in reviews], default=None)
+    labelled = {}
+    for review, label in zip(reviews, labels):
+        if label:
+            review["sentiment"] = label
+            labelled[review["submission_id"]] = review
+    if not labelled:
+        return 0
+    # Deleting first means a concurrent flusher cannot count them too
+    placeholders = ",".join("?" * len(labelled))
+    claimed = conn.execute(
+        f"DELETE FROM unscored WHERE submission_id IN ({placeholders})"
+        " RETURNING submission_id",
+        list(labelled),
+    ).fetchall()
+    _record([labelled[row[0]] for row in claimed])
+    return len(claimed)
+
+
+def flush():
+    """Send batches until the spool is drained or a batch fails."""
+    backfill_labels()
+    total = 0
+    while True:
+        sent = flush_once()
+        if not sent:
+            return total
+        total += sent
+
+
+def _run():
+    while True:
+        _wake.wait(settings.REVIEW_FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            flush()
+        except Exception:  # noqa: BLE001
+            logger.exception("review flush failed")
+        finally:
+            close_old_connections()
+
+
+def start_on_request(sender, **kwargs):
+    """``request_started`` receiver: send what a previous run left."""
+    start_flusher()
+
+
+def start_flusher():
+    """Start this process's flusher thread if it is not running."""
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _flusher_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(
+                target=_run, name="review-flusher", daemon=True
+            )
+            _flusher.start()
@@ -0,0 +1,103 @@
+"""Per-dealer review aggregates.
+
+``DealerReviewStats`` holds, for each dealer, the review count, the
+count per sentiment label and how many reviewers bought their car there.
+The review queue adds every batch the backend stores with ``record``.
+Only reviews with a sentiment label are counted: the review listing
+scores an unlabelled review when it is read, so counting it as neutral
+would disagree with the listing once the analyzer is back. The queue
+records such reviews later, when it can label them.
+``manage.py rebuild_review_stats`` recomputes all rows from the backend
+with ``rebuild``. Summaries for any number of dealers cost one query,
+so the dealer listing can carry them without touching a review.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+
+from .models import DealerReviewStats
+
+LABELS = ("positive", "neutral", "negative")
+COUNTS = ("review_count", *LABELS, "purchased")
+
+
+def _tally(reviews):
+    totals = {}
+    for review in reviews:
+        try:
+            dealer_id = int(review["dealership"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        label = review.get("sentiment")
+        if label not in LABELS:
+            continue
+        counts = totals.setdefault(dealer_id, dict.fromkeys(COUNTS, 0))
+        counts["review_count"] += 1
+        counts[label] += 1
+        if review.get("purchase") in (True, "true", "True"):
+            counts["purchased"] += 1
+    return totals
+
+
+def record(reviews):
+    """Add newly stored reviews to their dealers' aggregates."""
+    totals = _tally(reviews)
+    if not totals:
+        return
+    with transaction.atomic():
+        DealerReviewStats.objects.bulk_create(
+            [DealerReviewStats(dealer_id=dealer_id) for dealer_id in totals],
+            ignore_conflicts=True,
+        )
+        for dealer_id, counts in totals.items():
+            DealerReviewStats.objects.filter(pk=dealer_id).update(
+                updated_at=Now(),
+                **{name: F(name) + n for name, n in counts.items() if n},
+            )
+
+
+def rebuild(reviews):
+    """Replace every aggregate with totals over ``reviews``."""
+    totals = _tally(reviews)
+    with transaction.atomic():
+        DealerReviewStats.objects.all().delete()
+        DealerReviewStats.objects.bulk_create(
+            DealerReviewStats(dealer_id=dealer_id, **counts)
+            for dealer_id, counts in totals.items()
+        )
+    return len(totals)
+
+
+def summarize(stats):
+    """JSON-ready summary of a ``DealerReviewStats`` (or None: no reviews)."""
+    counts = {
+        name: getattr(stats, name, 0) if stats is not None else 0
+        for name in COUNTS
+    }
+    total = counts["review_count"]
+
+    def share(n):
+        return round(n / total, 3) if total else 0
+
+    summary = dict(counts)
+    for name in LABELS:
+        summary[f"{name}_share"] = share(counts[name])
+    summary["purchase_ratio"] = share(counts["purchased"])
+    return summary
+
+
+def summaries(dealer_ids):
+    """dealer id -> summary, for every id in ``dealer_ids``."""
+    found = DealerReviewStats.objects.in_bulk(list(dealer_ids))
+    return {i: summarize(found.get(i)) for i in dealer_ids}
+
+
+async def asummaries(dealer_ids):
+    found = {
+        stats.dealer_id: stats
+        async for stats in DealerReviewStats.objects.filter(
+            dealer_id__in=list(dealer_ids)
+        )
+    }
+    return {i: summarize(found.get(i)) for i in dealer_ids}
@@ -0,0 +1,200 @@
+"""Content-addressed cache for review sentiment labels.
+
+Sentiment depends only on the review text and the analyzer's lexicon, so
+labels are keyed by a hash of both. Lookups go through a bounded
+in-process LRU first, then the ``SentimentResult`` table, and only the
+remaining misses are sent to the analyzer.
+"""
+
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+
+from . import async_restapis
+from .metrics import Counter, Gauge
+from .models import SentimentResult
+from .restapis import (
+    analyze_review_sentiments,
+    analyze_review_sentiments_batch,
+    available,
+    gather,
+    http_timeout,
+)
+
+LEXICON_VERSION = os.getenv("sentiment_lexicon_version", default="vader-1")
+LRU_SIZE = int(os.getenv("sentiment_cache_size", default="10000"))
+
+_lru = OrderedDict()
+_lock = threading.Lock()
+
+# Exported on /metrics; texts are counted once per distinct text per call
+LOOKUPS = Counter(
+    "sentiment_cache_lookups_total",
+    "Sentiment lookups by where the label was found (miss: scored).",
+    ("result",),
+)
+EVICTIONS = Counter(
+    "sentiment_cache_evictions_total",
+    "Labels evicted from the in-process sentiment LRU.",
+)
+ENTRIES = Gauge(
+    "sentiment_cache_entries", "Labels held in the in-process sentiment LRU."
+)
+CAPACITY = Gauge(
+    "sentiment_cache_capacity", "Size limit of the in-process sentiment LRU."
+)
+CAPACITY.set(LRU_SIZE)
+EVICTIONS.inc(amount=0)  # export 0 before the first eviction
+
+
+def normalize(text):
+    # VADER is case-sensitive (all-caps words are boosted), so only
+    # whitespace and unicode composition are normalized.
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def text_key(text, lexicon_version=LEXICON_VERSION):
+    data = f"{lexicon_version}\0{normalize(text)}".encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _remember(key, sentiment):
+    with _lock:
+        _lru[key] = sentiment
+        _lru.move_to_end(key)
+        while len(_lru) > LRU_SIZE:
+            _lru.popitem(last=False)
+            EVICTIONS.inc()
+        ENTRIES.set(len(_lru))
+
+
+def _score(texts):
+    sentiments = analyze_review_sentiments_batch(texts)
+    if sentiments is not None:
+        return sentiments
+    if not available("sentiment_analyzer"):
+        # Breaker open or request budget spent: fall back right away
+        return [None] * len(texts)
+    # Analyzer without /analyze_batch: score texts individually, in
+    # parallel, within one timeout budget for the whole set
+    responses = gather(
+        [(analyze_review_sentiments, text) for text in texts],
+        deadline=http_timeout,
+    )
+    return [
+        response.get("sentiment") if response else None
+        for response in responses
+    ]
+
+
+def _lookup(texts):
+    """Resolve ``texts`` from the LRU and the database.
+
+    Returns ``(keys, found, pending)``: the key of every text, the labels
+    resolved so far, and the distinct texts still to score by key.
+    """
+    keys = [text_key(text) for text in texts]
+    found = {}
+
+    with _lock:
+        for key in keys:
+            if key in _lru:
+                _lru.move_to_end(key)
+                found[key] = _lru[key]
+    LOOKUPS.inc("memory", amount=len(found))
+
+    missing = [key for key in set(keys) if key not in found]
+    if missing:
+        rows = SentimentResult.objects.filter(
+            text_hash__in=missing
+        ).values_list("text_hash", "sentiment")
+        db_found = dict(rows)
+        for key, sentiment in db_found.items():
+            found[key] = sentiment
+            _remember(key, sentiment)
+        LOOKUPS.inc("db", amount=len(db_found))
+
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            pending.setdefault(key, text)
+    LOOKUPS.inc("miss", amount=len(pending))
+    return keys, found, pending
+
+
+def _store(found, pending, scored):
+    new_rows = []
+    for key, sentiment in zip(pending, scored):
+        if sentiment is None:
+            continue
+        found[key] = sentiment
+        _remember(key, sentiment)
+        new_rows.append(
+            SentimentResult(
+                text_hash=key,
+                lexicon_version=LEXICON_VERSION,
+                sentiment=sentiment,
+            )
+        )
+    SentimentResult.objects.bulk_create(new_rows, ignore_conflicts=True)
+
+
+def get_sentiments(texts, default="neutral"):
+    """Return a sentiment label for every text, in input order.
+
+    Counters are per distinct text, so duplicates in one call count once.
+
+    Texts the analyzer could not score come back as ``default`` and are
+    not cached, so they are retried on the next call.
+    """
+    keys, found, pending = _lookup(texts)
+    if pending:
+        _store(found, pending, _score(list(pending.values())))
+    return [found.get(key, default) for key in keys]
+
+
+async def _ascore(texts):
+    sentiments = await async_restapis.analyze_review_sentiments_batch(texts)
+    if sentiments is not None:
+        return sentiments
+    if not available("sentiment_analyzer"):
+        return [None] * len(texts)
+    responses = await async_restapis.gather(
+        [async_restapis.analyze_review_sentiments(text) for text in texts],
+        deadline=http_timeout,
+    )
+    return [
+        response.get("sentiment") if response else None
+        for response in responses
+    ]
+
+
+async def aget_sentiments(texts, default="neutral"):
+    """Async version of ``get_sentiments`` for the ASGI views."""
+    keys, found, pending = await sync_to_async(_lookup)(texts)
+    if pending:
+        scored = await _ascore(list(pending.values()))
+        await sync_to_async(_store)(found, pending, scored)
+    return [found.get(key, default) for key in keys]
+
+
+def stats():
+    """Snapshot of the hit/miss/eviction counters and LRU occupancy."""
+    return {
+        "memory_hits": LOOKUPS.value("memory"),
+        "db_hits": LOOKUPS.value("db"),
+        "misses": LOOKUPS.value("miss"),
+        "evictions": EVICTIONS.value(),
+        "memory_size": ENTRIES.value(),
+        "memory_limit": LRU_SIZE,
+    }
+
+
+def clear_memory():
+    with _lock:
+        _lru.clear()
+        ENTRIES.set(0)
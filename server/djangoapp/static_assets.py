@@ -0,0 +1,223 @@
+"""Hashed, precompressed static files and a cached SPA shell.
+
+``CompressedManifestStaticFilesStorage`` is Django's manifest storage
+(content-hashed copies of every file, e.g. ``style.3f2a1b9c8d7e.css``)
+that also writes ``.gz`` (and ``.br`` when the brotli module is
+installed) next to each text asset during ``collectstatic``, at the
+highest levels, since that cost is paid once per deploy.
+
+``serve_static`` serves ``STATIC_ROOT`` from an index built on first
+use: it sends the precompressed variant the client accepts, answers
+``If-None-Match`` with a 304, and marks hashed names (Django's and the
+React build's) cacheable for a year. Page templates link assets with
+``{% static %}``, which resolves to the hashed names outside DEBUG. Run
+``collectstatic`` before the server starts; files added later are not
+picked up until a restart.
+
+``spa_shell`` renders a page template once and serves the bytes from
+memory with a fixed ETag, so page loads touch neither the template
+engine nor the disk. ``settings.SPA_SHELL_CACHE = False`` renders on
+every request instead, for working on the templates.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+)
+from django.template.loader import render_to_string
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
+
+from .http_cache import accepted_encodings, cache_policy, variant_etag
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+# File types worth compressing; images and fonts are compressed already
+COMPRESSIBLE = re.compile(
+    r"\.(css|js|mjs|map|json|html|svg|txt|xml|ico|webmanifest)$"
+)
+# A content hash in the name: Django's (12 hex digits) or the React
+# build's (8), e.g. main.3f2a1b9c.js or style.3f2a1b9c8d7e.css
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.(?:chunk\.)?[^./]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Unhashed names (favicon.ico, manifest.json...) may change on deploy
+REVALIDATE = "public, max-age=3600"
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def _precompress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes compressed variants."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(paths) | set(self.hashed_files.values())):
+            if COMPRESSIBLE.search(name) and self.exists(name):
+                self._write_variants(name)
+
+    def _write_variants(self, name):
+        with self.open(name) as source:
+            data = source.read()
+        for encoding in ENCODINGS:
+            path = self.path(name + SUFFIXES[encoding])
+            body = None
+            if len(data) >= settings.COMPRESS_MIN_SIZE:
+                body = _precompress(data, encoding)
+            # Keep a variant only when it saves a meaningful amount
+            if body is None or len(body) > len(data) * 0.9:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            with open(path, "wb") as target:
+                target.write(body)
+
+
+class _StaticFile:
+    __slots__ = ("path", "content_type", "etag", "cache_control", "variants")
+
+    def __init__(self, path, name):
+        stat = os.stat(path)
+        self.path = path
+        self.content_type = (
+            mimetypes.guess_type(name)[0] or "application/octet-stream"
+        )
+        self.etag = '"%x-%x"' % (stat.st_mtime_ns, stat.st_size)
+        self.cache_control = (
+            IMMUTABLE if HASHED_NAME.search(name) else REVALIDATE
+        )
+        self.variants = {
+            encoding: path + SUFFIXES[encoding]
+            for encoding in ENCODINGS
+            if os.path.exists(path + SUFFIXES[encoding])
+        }
+
+
+_lock = threading.Lock()
+_static_files = None
+
+
+def _index_static_root():
+    files = {}
+    root = settings.STATIC_ROOT
+    for directory, _, names in os.walk(root):
+        for filename in names:
+            if filename.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, "/")
+            files[name] = _StaticFile(path, name)
+    return files
+
+
+def static_files():
+    """Relative name -> ``_StaticFile`` for everything in STATIC_ROOT."""
+    global _static_files
+    if _static_files is None:
+        with _lock:
+            if _static_files is None:
+                _static_files = _index_static_root()
+    return _static_files
+
+
+def _pick_variant(request, entry):
+    if not entry.variants:
+        return None
+    try:
+        accepted = accepted_encodings(
+            request.headers.get("Accept-Encoding", "")
+        )
+    except ValueError:
+        return None
+    for encoding in ENCODINGS:
+        if encoding in entry.variants and (
+            encoding in accepted or "*" in accepted
+        ):
+            return encoding
+    return None
+
+
+@require_safe
+def serve_static(request, path):
+    entry = static_files().get(path)
+    if entry is None:
+        raise Http404(path)
+    encoding = _pick_variant(request, entry)
+    etag = variant_etag(entry.etag, encoding)
+
+    client_etags = parse_etags(request.headers.get("If-None-Match", ""))
+    if etag in client_etags or "*" in client_etags:
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(
+            open(entry.variants.get(encoding, entry.path), "rb"),
+            content_type=entry.content_type,
+        )
+        if encoding:
+            response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    response["Cache-Control"] = entry.cache_control
+    if entry.variants:
+        response["Vary"] = "Accept-Encoding"
+    return response
+
+
+class _Shell:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+_shells = {}
+
+
+def _render_shell(template_name):
+    shell = _shells.get(template_name)
+    if shell is None or not settings.SPA_SHELL_CACHE:
+        shell = _Shell(render_to_string(template_name).encode())
+        if settings.SPA_SHELL_CACHE:
+            _shells[template_name] = shell
+    return shell
+
+
+def spa_shell(template_name):
+    """A view serving ``template_name`` rendered once, for SPA routes.
+
+    The templates are static HTML (no tags that depend on the request),
+    so one rendering serves every visitor. Clients revalidate on each
+    load and get a 304 until a deploy changes the page;
+    ``HttpCacheMiddleware`` compresses it once per ETag.
+    """
+
+    @cache_policy(public=True)
+    @require_safe
+    def view(request, **kwargs):
+        shell = _render_shell(template_name)
+        response = HttpResponse(shell.body)
+        response["ETag"] = shell.etag
+        return response
+
+    return view
@@ -8,6 +8,7 @@ app_name = "djangoapp"
 urlpatterns = [
     # path for user login API
     path("get_cars", views.get_cars, name="getcars"),
+    path("search_cars/", views.search_cars, name="search_cars"),
     path("login/", views.login_user, name="login"),
     path("logout/", views.logout_request, name="logout"),
     path("register/", views.registration, name="register"),
@@ -18,6 +19,11 @@ urlpatterns = [
         views.get_dealerships,
         name="get_dealers_by_state",
     ),
+    path(
+        "dealers/nearest/",
+        views.get_nearest_dealers,
+        name="nearest_dealers",
+    ),
     path(
         route="dealer/<int:dealer_id>/",
         view=views.get_dealer_details,
@@ -29,7 +35,40 @@ urlpatterns = [
         view=views.get_dealer_reviews,
         name="dealer_reviews",
     ),
+    path(
+        route="reviews/dealer/<int:dealer_id>/summary/",
+        view=views.get_dealer_review_summary,
+        name="dealer_review_summary",
+    ),
     path(route="add_review", view=views.add_review, name="add_review"),
+    # paths for dealer inventory
+    path("inventory/", views.get_inventory_cars, name="inventory"),
+    path(
+        route="inventory/dealer/<int:dealer_id>/",
+        view=views.get_inventory_cars,
+        name="dealer_inventory",
+    ),
+    # async variants of the dealer and review paths (serve under ASGI)
+    path(
+        "async/get_dealers/",
+        views.get_dealerships_async,
+        name="get_dealers_async",
+    ),
+    path(
+        "async/get_dealers/<str:state>/",
+        views.get_dealerships_async,
+        name="get_dealers_by_state_async",
+    ),
+    path(
+        route="async/dealer/<int:dealer_id>/",
+        view=views.get_dealer_details_async,
+        name="dealer_details_async",
+    ),
+    path(
+        route="async/reviews/dealer/<int:dealer_id>/",
+        view=views.get_dealer_reviews_async,
+        name="dealer_reviews_async",
+    ),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
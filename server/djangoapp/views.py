@@ -1,4 +1,8 @@
-from django.http import JsonResponse
+from django.http import (
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
 from django.contrib.auth import login, logout, authenticate
 from django.views.decorators.csrf import csrf_exempt
@@ -6,37 +10,111 @@ import json
 import logging
 
 # External API helpers
-from .restapis import (
-    get_request,
-    analyze_review_sentiments,
-    post_review,
-)
-
-# Models for Cars API
-from .models import CarMake, CarModel
-from .populate import initiate
+from .restapis import get_request
+from . import async_restapis
+from .backend_cache import acached_get_request, cached_get_request
+from .sentiment_cache import aget_sentiments, get_sentiments
+
+# Cars API
+from .catalog import get_catalog, search
+from .dealer_index import get_dealer_index
+from .http_cache import cache_policy, no_store
+from .inventory import get_inventory
+from .metrics import render as render_metrics
+from .responses import FastJsonResponse, RawJsonResponse, envelope
+from .review_queue import enqueue as enqueue_review
+from .review_stats import asummaries as areview_summaries
+from .review_stats import summaries as review_summaries
 
 logger = logging.getLogger(__name__)
 
 
 # ---------------------- CARS API ---------------------- #
+@cache_policy(public=True, max_age=60)
 def get_cars(request):
-    if CarMake.objects.count() == 0:
-        initiate()
+    # The catalog is seeded after migrate (see apps.py) and served from
+    # a pre-serialized, versioned cache entry. HttpCacheMiddleware answers
+    # If-None-Match against this ETag.
+    body, etag = get_catalog()
+    response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    return response
+
+
+# Largest page a client may request from search_cars
+MAX_CAR_PAGE = 500
 
-    car_models = CarModel.objects.select_related("car_make")
-    cars = [
-        {"CarModel": cm.name, "CarMake": cm.car_make.name}
-        for cm in car_models
-    ]
-    return JsonResponse({"CarModels": cars})
+
+def _optional_int(request, name):
+    value = request.GET.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+
+@cache_policy(public=True, max_age=60)
+def search_cars(request):
+    try:
+        limit = _optional_int(request, "limit") or 50
+        if not 1 <= limit <= MAX_CAR_PAGE:
+            raise ValueError(f"limit must be between 1 and {MAX_CAR_PAGE}")
+        cars, next_cursor = search(
+            make=request.GET.get("make"),
+            car_type=request.GET.get("type"),
+            year_min=_optional_int(request, "year_min"),
+            year_max=_optional_int(request, "year_max"),
+            dealer_id=_optional_int(request, "dealer_id"),
+            order=request.GET.get("order", "id"),
+            limit=limit,
+            after=request.GET.get("after"),
+        )
+    except ValueError as exc:
+        return FastJsonResponse(
+            {"status": 400, "message": str(exc)}, status=400
+        )
+    return FastJsonResponse({"status": 200, "cars": cars, "next": next_cursor})
+
+
+# ---------------------- INVENTORY ---------------------- #
+@cache_policy(public=True, max_age=60)
+def get_inventory_cars(request, dealer_id=None):
+    # Served from the in-memory columnar inventory (see inventory.py)
+    try:
+        limit = _optional_int(request, "limit") or 50
+        if not 1 <= limit <= MAX_CAR_PAGE:
+            raise ValueError(f"limit must be between 1 and {MAX_CAR_PAGE}")
+        after = _optional_int(request, "after")
+        if after is not None and after < 0:
+            raise ValueError("after must be a car id")
+        if dealer_id is None:
+            dealer_id = _optional_int(request, "dealer_id")
+        cars, next_cursor = get_inventory().query(
+            dealer_id=dealer_id,
+            make=request.GET.get("make"),
+            model=request.GET.get("model"),
+            year_min=_optional_int(request, "year_min"),
+            year_max=_optional_int(request, "year_max"),
+            mileage_min=_optional_int(request, "mileage_min"),
+            mileage_max=_optional_int(request, "mileage_max"),
+            limit=limit,
+            after=after,
+        )
+    except ValueError as exc:
+        return FastJsonResponse(
+            {"status": 400, "message": str(exc)}, status=400
+        )
+    return FastJsonResponse({"status": 200, "cars": cars, "next": next_cursor})
 
 
 # ---------------------- AUTH: LOGIN ---------------------- #
+@cache_policy(no_store=True)
 @csrf_exempt
 def login_user(request):
     if request.method != "POST":
-        return JsonResponse(
+        return FastJsonResponse(
             {"error": "Only POST method is allowed"},
             status=405,
         )
@@ -46,10 +124,10 @@ def login_user(request):
         username = data.get("username") or data.get("userName")
         password = data.get("password")
     except json.JSONDecodeError:
-        return JsonResponse({"error": "Invalid JSON"}, status=400)
+        return FastJsonResponse({"error": "Invalid JSON"}, status=400)
 
     if not username or not password:
-        return JsonResponse(
+        return FastJsonResponse(
             {"error": "Username and password required"},
             status=400,
         )
@@ -58,7 +136,7 @@ def login_user(request):
     if user:
         login(request, user)
         logger.info("User '%s' logged in successfully.", username)
-        return JsonResponse(
+        return FastJsonResponse(
             {
                 "userName": username,
                 "status": "Authenticated",
@@ -66,25 +144,27 @@ def login_user(request):
         )
 
     logger.warning("Failed login attempt for username '%s'.", username)
-    return JsonResponse(
+    return FastJsonResponse(
         {"userName": username, "status": "Failed"},
         status=401,
     )
 
 
 # ---------------------- AUTH: LOGOUT ---------------------- #
+@cache_policy(no_store=True)
 @csrf_exempt
 def logout_request(request):
     logout(request)
     logger.info("User logged out.")
-    return JsonResponse({"status": "Logged Out"})
+    return FastJsonResponse({"status": "Logged Out"})
 
 
 # ---------------------- AUTH: REGISTRATION ---------------------- #
+@cache_policy(no_store=True)
 @csrf_exempt
 def registration(request):
     if request.method != "POST":
-        return JsonResponse(
+        return FastJsonResponse(
             {"error": "Only POST method is allowed"},
             status=405,
         )
@@ -95,16 +175,16 @@ def registration(request):
         password = data.get("password")
         email = data.get("email")
     except json.JSONDecodeError:
-        return JsonResponse({"error": "Invalid JSON"}, status=400)
+        return FastJsonResponse({"error": "Invalid JSON"}, status=400)
 
     if not username or not password:
-        return JsonResponse(
+        return FastJsonResponse(
             {"error": "Username and password are required"},
             status=400,
         )
 
     if User.objects.filter(username=username).exists():
-        return JsonResponse(
+        return FastJsonResponse(
             {"error": "Username already exists"},
             status=400,
         )
@@ -115,38 +195,198 @@ def registration(request):
         email=email or "",
     )
     logger.info("New user registered: %s", username)
-    return JsonResponse(
+    return FastJsonResponse(
         {"userName": user.username, "status": "Registered"}
     )
 
 
 # ---------------------- DEALERSHIPS ---------------------- #
+@cache_policy(public=True, max_age=60)
 def get_dealerships(request, state="All"):
-    if state == "All":
-        endpoint = "/fetchDealers"
+    states = _requested_states(request, state)
+    index = get_dealer_index() if states else None
+    if index is not None:
+        dealerships = index.in_states(states)
     else:
-        endpoint = f"/fetchDealers/{state}"
-    dealerships = get_request(endpoint)
-    return JsonResponse({"status": 200, "dealers": dealerships})
+        if state == "All":
+            endpoint = "/fetchDealers"
+        else:
+            endpoint = f"/fetchDealers/{state}"
+        dealerships = cached_get_request(endpoint, "dealers")
+    if not isinstance(dealerships, list):
+        # Backend unavailable: same body as before, but never cached
+        return no_store(
+            FastJsonResponse({"status": 200, "dealers": dealerships})
+        )
+    summaries = review_summaries([d.get("id") for d in dealerships])
+    dealerships = _with_summaries(dealerships, summaries)
+    return FastJsonResponse({"status": 200, "dealers": dealerships})
+
+
+def _requested_states(request, state):
+    # ?states=Texas,KS (or a comma-separated path segment) selects several
+    # states; filtered lists come from the in-memory dealer index
+    states = request.GET.get("states") or (None if state == "All" else state)
+    return states.split(",") if states else None
+
+
+def _with_summaries(dealerships, summaries):
+    # Copies: the dealer dicts may be shared with the dealer index
+    return [
+        {**dealer, "review_summary": summaries[dealer.get("id")]}
+        for dealer in dealerships
+    ]
+
+
+# Largest ?n= for nearest-dealer queries
+MAX_NEAREST = 100
+
+
+@cache_policy(public=True, max_age=300)
+def get_nearest_dealers(request):
+    # ?lat=&long= or ?zip=, optional ?n= and ?states=
+    index = get_dealer_index()
+    if index is None:
+        return FastJsonResponse(
+            {"status": 503, "message": "Dealer data unavailable"}, status=503
+        )
+    try:
+        n = _optional_int(request, "n") or 5
+        if not 1 <= n <= MAX_NEAREST:
+            raise ValueError(f"n must be between 1 and {MAX_NEAREST}")
+        if request.GET.get("zip"):
+            point = index.locate_zip(request.GET["zip"])
+            if point is None:
+                return FastJsonResponse(
+                    {"status": 404, "message": "Unknown zip code"},
+                    status=404,
+                )
+            lat, lon = point
+        else:
+            try:
+                lat = float(request.GET.get("lat", ""))
+                lon = float(request.GET.get("long", ""))
+            except ValueError:
+                raise ValueError("lat and long (or zip) are required")
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                raise ValueError("lat/long out of range")
+    except ValueError as exc:
+        return FastJsonResponse(
+            {"status": 400, "message": str(exc)}, status=400
+        )
+    states = request.GET.get("states")
+    dealers = [
+        {**dealer, "distance_km": round(km, 2)}
+        for dealer, km in index.nearest(
+            lat, lon, n, states.split(",") if states else None
+        )
+    ]
+    return FastJsonResponse({"status": 200, "dealers": dealers})
 
 
+@cache_policy(public=True, max_age=300)
 def get_dealer_details(request, dealer_id):
     if dealer_id:
         endpoint = f"/fetchDealer/{dealer_id}"
-        dealership = get_request(endpoint)
-        return JsonResponse(
-            {"status": 200, "dealer": [dealership]}
-        )
-    return JsonResponse({"status": 400, "message": "Bad Request"})
+        # The backend's bytes are relayed without a decode/encode trip
+        dealership = cached_get_request(endpoint, "dealer", raw=True)
+        if dealership is None:
+            return no_store(
+                FastJsonResponse({"status": 200, "dealer": [None]})
+            )
+        body = b"[" + dealership + b"]"
+        return RawJsonResponse(envelope({"status": 200}, "dealer", body))
+    return no_store(
+        FastJsonResponse({"status": 400, "message": "Bad Request"})
+    )
+
+
+# Largest page a client may request with ?limit=
+MAX_REVIEW_PAGE = 500
+# Reviews fetched and scored per step when streaming
+STREAM_PAGE_SIZE = 50
 
 
+def _review_page_params(request):
+    """Parse ``?limit=&after=`` into ints (``None`` when absent).
+
+    Raises ``ValueError`` on malformed or out-of-range values.
+    """
+    limit = request.GET.get("limit")
+    after = request.GET.get("after")
+    try:
+        limit = int(limit) if limit else None
+        after = int(after) if after else None
+    except ValueError:
+        raise ValueError("limit and after must be integers")
+    if limit is not None and not 1 <= limit <= MAX_REVIEW_PAGE:
+        raise ValueError(f"limit must be between 1 and {MAX_REVIEW_PAGE}")
+    if after is not None and after < 0:
+        raise ValueError("after must be a review id")
+    return limit, after
+
+
+def _page_query(limit, after):
+    query = {}
+    if limit is not None:
+        query["limit"] = limit
+    if after is not None:
+        query["after"] = after
+    return query
+
+
+def _label_reviews(reviews):
+    # Reviews scored at write time carry their label; only legacy
+    # reviews without one are scored here.
+    legacy = [r for r in reviews if not r.get("sentiment")]
+    sentiments = get_sentiments([r.get("review", "") for r in legacy])
+    for review_detail, sentiment in zip(legacy, sentiments):
+        review_detail["sentiment"] = sentiment
+
+
+def _stream_reviews(dealer_id, limit, after):
+    # NDJSON, one review per line, fetched and scored a page at a time
+    endpoint = f"/fetchReviews/dealer/{dealer_id}"
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_size = STREAM_PAGE_SIZE
+        if remaining is not None:
+            page_size = min(page_size, remaining)
+        reviews = get_request(endpoint, **_page_query(page_size, after))
+        if reviews is None:
+            yield json.dumps({"error": "Failed to fetch reviews"}) + "\n"
+            return
+        _label_reviews(reviews)
+        for review_detail in reviews:
+            yield json.dumps(review_detail) + "\n"
+        if len(reviews) < page_size:
+            return
+        after = reviews[-1]["id"]
+        if remaining is not None:
+            remaining -= len(reviews)
+
+
+@cache_policy(public=True)
 def get_dealer_reviews(request, dealer_id):
     if dealer_id:
+        try:
+            limit, after = _review_page_params(request)
+        except ValueError as exc:
+            return FastJsonResponse(
+                {"status": 400, "message": str(exc)}, status=400
+            )
+
+        if request.GET.get("stream"):
+            return StreamingHttpResponse(
+                _stream_reviews(dealer_id, limit, after),
+                content_type="application/x-ndjson",
+            )
+
         endpoint = f"/fetchReviews/dealer/{dealer_id}"
-        reviews = get_request(endpoint)
+        reviews = get_request(endpoint, **_page_query(limit, after))
 
         if reviews is None:
-            return JsonResponse(
+            return no_store(FastJsonResponse(
                 {
                     "status": 500,
                     "message": (
@@ -154,34 +394,179 @@ def get_dealer_reviews(request, dealer_id):
                         "external service."
                     ),
                 }
+            ))
+
+        _label_reviews(reviews)
+        response = {"status": 200, "reviews": reviews}
+        if limit is not None and len(reviews) == limit:
+            # cursor for the next page: pass back as ?after=
+            response["next"] = reviews[-1]["id"]
+        return FastJsonResponse(response)
+
+    return no_store(
+        FastJsonResponse({"status": 400, "message": "Bad Request"})
+    )
+
+
+@cache_policy(public=True, max_age=30)
+def get_dealer_review_summary(request, dealer_id):
+    # Precomputed aggregates (review_stats.py); no review is fetched
+    return FastJsonResponse({
+        "status": 200,
+        "dealer_id": dealer_id,
+        "summary": review_summaries([dealer_id])[dealer_id],
+    })
+
+
+# ---------------------- ASYNC DEALERSHIPS ---------------------- #
+# ASGI-native variants of the dealer views above. Under uvicorn/daphne
+# they await backend I/O instead of holding a worker thread.
+@cache_policy(public=True, max_age=60)
+async def get_dealerships_async(request, state="All"):
+    states = _requested_states(request, state)
+    # The index is built (rarely) with blocking calls; keep them off the loop
+    index = (
+        await sync_to_async(get_dealer_index, thread_sensitive=False)()
+        if states else None
+    )
+    if index is not None:
+        dealerships = index.in_states(states)
+    elif state == "All":
+        dealerships = await acached_get_request("/fetchDealers", "dealers")
+    else:
+        dealerships = await acached_get_request(
+            f"/fetchDealers/{state}", "dealers"
+        )
+    if not isinstance(dealerships, list):
+        return no_store(
+            FastJsonResponse({"status": 200, "dealers": dealerships})
+        )
+    summaries = await areview_summaries([d.get("id") for d in dealerships])
+    dealerships = _with_summaries(dealerships, summaries)
+    return FastJsonResponse({"status": 200, "dealers": dealerships})
+
+
+@cache_policy(public=True, max_age=300)
+async def get_dealer_details_async(request, dealer_id):
+    if dealer_id:
+        endpoint = f"/fetchDealer/{dealer_id}"
+        # The backend's bytes are relayed without a decode/encode trip
+        dealership = await acached_get_request(endpoint, "dealer", raw=True)
+        if dealership is None:
+            return no_store(
+                FastJsonResponse({"status": 200, "dealer": [None]})
             )
+        body = b"[" + dealership + b"]"
+        return RawJsonResponse(envelope({"status": 200}, "dealer", body))
+    return no_store(
+        FastJsonResponse({"status": 400, "message": "Bad Request"})
+    )
+
 
+async def _alabel_reviews(reviews):
+    legacy = [r for r in reviews if not r.get("sentiment")]
+    sentiments = await aget_sentiments(
+        [r.get("review", "") for r in legacy]
+    )
+    for review_detail, sentiment in zip(legacy, sentiments):
+        review_detail["sentiment"] = sentiment
+
+
+async def _astream_reviews(dealer_id, limit, after):
+    endpoint = f"/fetchReviews/dealer/{dealer_id}"
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_size = STREAM_PAGE_SIZE
+        if remaining is not None:
+            page_size = min(page_size, remaining)
+        reviews = await async_restapis.get_request(
+            endpoint, **_page_query(page_size, after)
+        )
+        if reviews is None:
+            yield json.dumps({"error": "Failed to fetch reviews"}) + "\n"
+            return
+        await _alabel_reviews(reviews)
         for review_detail in reviews:
-            response = analyze_review_sentiments(
-                review_detail.get("review", "")
+            yield json.dumps(review_detail) + "\n"
+        if len(reviews) < page_size:
+            return
+        after = reviews[-1]["id"]
+        if remaining is not None:
+            remaining -= len(reviews)
+
+
+@cache_policy(public=True)
+async def get_dealer_reviews_async(request, dealer_id):
+    if dealer_id:
+        try:
+            limit, after = _review_page_params(request)
+        except ValueError as exc:
+            return FastJsonResponse(
+                {"status": 400, "message": str(exc)}, status=400
+            )
+
+        if request.GET.get("stream"):
+            return StreamingHttpResponse(
+                _astream_reviews(dealer_id, limit, after),
+                content_type="application/x-ndjson",
             )
-            if response:
-                sentiment = response.get("sentiment", "neutral")
-            else:
-                sentiment = "neutral"
-            review_detail["sentiment"] = sentiment
 
-        return JsonResponse({"status": 200, "reviews": reviews})
+        endpoint = f"/fetchReviews/dealer/{dealer_id}"
+        reviews = await async_restapis.get_request(
+            endpoint, **_page_query(limit, after)
+        )
+
+        if reviews is None:
+            return no_store(FastJsonResponse(
+                {
+                    "status": 500,
+                    "message": (
+                        "Failed to fetch reviews from "
+                        "external service."
+                    ),
+                }
+            ))
+
+        await _alabel_reviews(reviews)
+        response = {"status": 200, "reviews": reviews}
+        if limit is not None and len(reviews) == limit:
+            response["next"] = reviews[-1]["id"]
+        return FastJsonResponse(response)
 
-    return JsonResponse({"status": 400, "message": "Bad Request"})
+    return no_store(
+        FastJsonResponse({"status": 400, "message": "Bad Request"})
+    )
 
 
 # ---------------------- ADD REVIEW ---------------------- #
+@cache_policy(no_store=True)
 @csrf_exempt
 def add_review(request):
     if not request.user.is_anonymous:
         try:
             data = json.loads(request.body.decode("utf-8"))
-            post_review(data)
-            return JsonResponse({"status": 200})
+            # Spooled and sent to the backend in batches, with sentiment
+            # scored on the way (djangoapp/review_queue.py)
+            submission_id = enqueue_review(data)
+            return FastJsonResponse(
+                {"status": 202, "submission_id": submission_id}, status=202
+            )
+        except ValueError as exc:
+            return FastJsonResponse(
+                {"status": 400, "message": str(exc)}, status=400
+            )
         except Exception as exc:  # noqa: BLE001
             logger.error("Error posting review: %s", exc)
-            return JsonResponse(
+            return FastJsonResponse(
                 {"status": 401, "message": "Error in posting review"},
             )
-    return JsonResponse({"status": 403, "message": "Unauthorized"})
+    return FastJsonResponse({"status": 403, "message": "Unauthorized"})
+
+
+# ---------------------- METRICS ---------------------- #
+@cache_policy(no_store=True)
+def get_metrics(request):
+    # Prometheus text exposition of this process's request metrics
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4"
+    )
@@ -1,11 +1,14 @@
 """
 Django settings for djangoproj project.
-Generated by 'django-admin startproject' using Django 3.2.5.
+Generated by 'django-admin startproject' using Django 3.2.5; needs
+Django 5.1+ (SQLite transaction_mode, PostgreSQL connection pools).
 """
 
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # -------------------------------------------------------------
 # Base Directory
 # -------------------------------------------------------------
@@ -64,6 +67,10 @@ INSTALLED_APPS = [
 # Middleware
 # -------------------------------------------------------------
 MIDDLEWARE = [
+    # First, so its wall time covers every other middleware
+    "djangoapp.middleware.RequestMetricsMiddleware",
+    # Cache-Control, ETags, 304s and compression (djangoapp/http_cache.py)
+    "djangoapp.http_cache.HttpCacheMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -75,6 +82,9 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "djangoproj.urls"
 
+# Add a Server-Timing header (total, db, upstream calls) to responses
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+
 # -------------------------------------------------------------
 # Templates
 # -------------------------------------------------------------
@@ -104,12 +114,178 @@ WSGI_APPLICATION = "djangoproj.wsgi.application"
 # -------------------------------------------------------------
 # Database
 # -------------------------------------------------------------
-DATABASES = {
+# DJANGO_DB_ENGINE: "sqlite" (default) or "postgres".
+# DB_CONN_MAX_AGE: seconds a connection is reused across requests.
+# Defaults to 60 under WSGI and 0 under ASGI (djangoproj/asgi.py sets
+# DJANGO_ASGI): there each request runs in its own context, opens its own
+# connection and never reuses one, so keeping them open only leaks them.
+_conn_max_age = os.getenv(
+    "DB_CONN_MAX_AGE", "0" if os.getenv("DJANGO_ASGI") == "1" else "60"
+)
+_db_engine = os.getenv("DJANGO_DB_ENGINE", "sqlite")
+if _db_engine == "sqlite":
+    # WAL lets readers run alongside the single writer; write transactions
+    # take the lock up front (IMMEDIATE) so they wait up to
+    # SQLITE_BUSY_TIMEOUT seconds instead of failing with "database is
+    # locked" when a read lock cannot be upgraded.
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            "OPTIONS": {
+                "timeout": float(os.getenv("SQLITE_BUSY_TIMEOUT", "20")),
+                "transaction_mode": os.getenv(
+                    "SQLITE_TRANSACTION_MODE", "IMMEDIATE"
+                ),
+                "init_command": (
+                    "PRAGMA journal_mode="
+                    + os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+                    + "; PRAGMA synchronous=NORMAL;"
+                ),
+            },
+            "CONN_MAX_AGE": int(_conn_max_age),
+            "CONN_HEALTH_CHECKS": True,
+        }
+    }
+elif _db_engine == "postgres":
+    # Needs psycopg[pool]. Connections come from a per-process pool, which
+    # replaces persistent connections (CONN_MAX_AGE must stay 0).
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB", "dealerships"),
+            "USER": os.getenv("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+            "HOST": os.getenv("POSTGRES_HOST", "localhost"),
+            "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+                    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                    "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+                },
+            },
+            "CONN_HEALTH_CHECKS": True,
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown DJANGO_DB_ENGINE: {_db_engine!r}")
+
+# -------------------------------------------------------------
+# Cache
+# -------------------------------------------------------------
+# DJANGO_CACHE_BACKEND: "locmem" (default), "file" or "redis".
+# DJANGO_CACHE_LOCATION: directory for "file", URL for "redis".
+_CACHE_BACKENDS = {
+    "locmem": (
+        "django.core.cache.backends.locmem.LocMemCache",
+        "djangoapp",
+    ),
+    "file": (
+        "django.core.cache.backends.filebased.FileBasedCache",
+        os.path.join(BASE_DIR, "cache"),
+    ),
+    "redis": (
+        "django.core.cache.backends.redis.RedisCache",
+        "redis://127.0.0.1:6379/1",
+    ),
+}
+_cache_backend, _cache_location = _CACHE_BACKENDS[
+    os.getenv("DJANGO_CACHE_BACKEND", "locmem")
+]
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": _cache_backend,
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", _cache_location),
     }
 }
+# locmem is private to each worker process: deletes made by one worker
+# (logout, a user's password change) are not seen by the others
+_shared_cache = os.getenv("DJANGO_CACHE_BACKEND", "locmem") != "locmem"
+
+# Seconds a proxied backend response is served fresh, per endpoint group
+BACKEND_CACHE_TTLS = {
+    "dealers": int(os.getenv("DEALERS_CACHE_TTL", "300")),
+    "dealer": int(os.getenv("DEALER_CACHE_TTL", "600")),
+}
+# Extra seconds a stale entry is still served while it is refreshed
+BACKEND_CACHE_STALE = int(os.getenv("BACKEND_CACHE_STALE", "120"))
+
+# Car records served by the in-memory inventory (djangoapp/inventory.py)
+INVENTORY_PATH = os.getenv(
+    "INVENTORY_PATH",
+    os.path.join(BASE_DIR, "database", "data", "car_records.json"),
+)
+
+# Smallest response body, in bytes, that HttpCacheMiddleware compresses
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+
+# API response encoder (djangoapp/responses.py): auto uses orjson when it
+# is installed, else the stdlib encoder; orjson or stdlib force one
+JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", "auto")
+
+# Dealer state/nearest index (djangoapp/dealer_index.py): seconds
+# between rebuilds from the dealer feed, and the grid cell size
+DEALER_INDEX_REFRESH = int(os.getenv("DEALER_INDEX_REFRESH", "300"))
+DEALER_GRID_KM = float(os.getenv("DEALER_GRID_KM", "50"))
+
+# Reviews wait in this spool until the flusher posts them to the backend
+# in batches (djangoapp/review_queue.py)
+REVIEW_SPOOL_PATH = os.getenv(
+    "REVIEW_SPOOL_PATH", os.path.join(BASE_DIR, "review_spool.sqlite3")
+)
+REVIEW_BATCH_SIZE = int(os.getenv("REVIEW_BATCH_SIZE", "100"))
+# Seconds between flushes when fewer than a batch are waiting
+REVIEW_FLUSH_INTERVAL = float(os.getenv("REVIEW_FLUSH_INTERVAL", "1"))
+# Sends a review the backend rejects (4xx) gets before it is moved to
+# the spool's dead_letter table
+REVIEW_MAX_ATTEMPTS = int(os.getenv("REVIEW_MAX_ATTEMPTS", "5"))
+
+# -------------------------------------------------------------
+# Sessions & Authentication
+# -------------------------------------------------------------
+# db (default): a session row read (and often written) per request.
+# cached_db: reads served from CACHES, writes still go to the database;
+# needs a cache shared by every worker ("file" or "redis"), or a logout
+# would only end the session in the worker that handled it.
+# signed_cookies: no server-side storage; the session lives in a signed
+# cookie (keep it small, and note it cannot be revoked server-side).
+_SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+_session_backend = os.getenv("DJANGO_SESSION_BACKEND", "db")
+if _session_backend == "cached_db" and not _shared_cache:
+    raise ImproperlyConfigured(
+        "DJANGO_SESSION_BACKEND=cached_db needs DJANGO_CACHE_BACKEND=file "
+        "or redis"
+    )
+SESSION_ENGINE = _SESSION_ENGINES[_session_backend]
+
+# request.user is looked up through the cache (djangoapp/auth_backends.py)
+# when the cache is shared; with locmem (TTL 0) it is read from the
+# database, so password changes and deactivation reach every worker.
+AUTHENTICATION_BACKENDS = ["djangoapp.auth_backends.CachedModelBackend"]
+AUTH_USER_CACHE_TTL = int(
+    os.getenv("AUTH_USER_CACHE_TTL", "300" if _shared_cache else "0")
+)
+if AUTH_USER_CACHE_TTL and not _shared_cache:
+    raise ImproperlyConfigured(
+        "AUTH_USER_CACHE_TTL needs DJANGO_CACHE_BACKEND=file or redis"
+    )
+
+# PBKDF2 work factor; see benchmarks/login.py before lowering it
+PASSWORD_HASH_ITERATIONS = int(
+    os.getenv("PASSWORD_HASH_ITERATIONS", "1000000")
+)
+PASSWORD_HASHERS = [
+    "djangoapp.hashers.TunedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
 
 # -------------------------------------------------------------
 # Password Validation
@@ -168,6 +344,23 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "frontend/static"),
 ]
 
+# Content-hashed copies plus .gz/.br variants, written by collectstatic
+# and served by djangoapp.static_assets.serve_static
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "djangoapp.static_assets.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
+
+# Render the React/HTML page templates once per process; turn off while
+# editing them
+SPA_SHELL_CACHE = os.getenv("SPA_SHELL_CACHE", "1") == "1"
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
@@ -175,3 +368,28 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 # Default Primary Key
 # -------------------------------------------------------------
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# -------------------------------------------------------------
+# Logging
+# -------------------------------------------------------------
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "djangoapp.jsonlog.JsonFormatter"},
+        "text": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": os.getenv("LOG_FORMAT", "json"),
+        },
+    },
+    "loggers": {
+        "djangoapp": {
+            "handlers": ["console"],
+            "level": os.getenv("LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
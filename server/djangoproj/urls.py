@@ -1,9 +1,11 @@
 from django.contrib import admin
-from django.urls import path, include
-from django.views.generic import TemplateView
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from djangoapp.static_assets import serve_static, spa_shell
+from djangoapp.views import get_metrics
+
 urlpatterns = [
     # Admin
     path("admin/", admin.site.urls),
@@ -11,29 +13,25 @@ urlpatterns = [
     # Backend APIs
     path("djangoapp/", include("djangoapp.urls")),
 
-    # Frontend / React routes
-    path("", TemplateView.as_view(template_name="Home.html")),
-    path("about/", TemplateView.as_view(template_name="About.html")),
-    path("contact/", TemplateView.as_view(template_name="Contact.html")),
-    path("login/", TemplateView.as_view(template_name="index.html")),
-    path("register/", TemplateView.as_view(template_name="index.html")),
-    path("dealers/", TemplateView.as_view(template_name="index.html")),
-    path(
-        "dealer/<int:dealer_id>/",
-        TemplateView.as_view(template_name="index.html"),
-    ),
-    path(
-        "postreview/<int:dealer_id>/",
-        TemplateView.as_view(template_name="index.html"),
-    ),
+    # Prometheus metrics
+    path("metrics", get_metrics, name="metrics"),
+
+    # Collected static files: precompressed, hashed names cached a year
+    re_path(r"^static/(?P<path>.+)$", serve_static),
+
+    # Frontend / React routes, rendered once and served from memory
+    path("", spa_shell("Home.html")),
+    path("about/", spa_shell("About.html")),
+    path("contact/", spa_shell("Contact.html")),
+    path("login/", spa_shell("index.html")),
+    path("register/", spa_shell("index.html")),
+    path("dealers/", spa_shell("index.html")),
+    path("dealer/<int:dealer_id>/", spa_shell("index.html")),
+    path("postreview/<int:dealer_id>/", spa_shell("index.html")),
 ]
 
-# Serve static & media files during development
+# Serve media files during development
 if settings.DEBUG:
-    urlpatterns += static(
-        settings.STATIC_URL,
-        document_root=settings.STATIC_ROOT,
-    )
     urlpatterns += static(
         settings.MEDIA_URL,
         document_root=settings.MEDIA_ROOT,
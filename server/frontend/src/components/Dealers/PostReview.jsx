@@ -57,7 +57,8 @@ const PostReview = () => {
   });
 
   const json = await res.json();
-  if (json.status === 200) {
+  // 202: the review is queued and shows up once it reaches the backend
+  if (json.status === 200 || json.status === 202) {
       window.location.href = window.location.origin+"/dealer/"+id;
   }
 